@@ -20,6 +20,11 @@ import numpy as np
 from datetime import datetime
 import logging
 import glob
+import sys
+
+# The date table is shared with the cleaner in bibliography_cleaned
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bibliography_cleaned'))
+from zweig_dates import extract_date_table
 
 # Configure logging
 log_filename = f'zweig_analysis_{datetime.now().strftime("%Y%m%d_%H%M")}.log'
@@ -453,34 +458,32 @@ def analyze_work_references(df):
     return work_references
 
 def analyze_publication_timeline(df):
-    """Analyze the publication timeline based on years mentioned in content"""
-    # Extract all years from content
-    all_years = []
-    year_pattern = r'\b(1[8-9]\d{2}|20[0-2]\d)\b'
-    
-    for content in df['content']:
-        years = re.findall(year_pattern, content)
-        if years:
-            all_years.extend(years)
-    
-    # Convert to integers and filter valid range
-    all_years = [int(year) for year in all_years if 1850 <= int(year) <= 2025]
-    
-    # Count frequency of each year
-    year_counts = Counter(all_years)
-    
-    # Sort by year
-    timeline = {year: count for year, count in sorted(year_counts.items())}
+    """Analyze the publication timeline based on years mentioned in content.
+    A range counts as a mention of its start and end year; two-digit ends are
+    expanded, so "1925-27" also counts 1927, which the earlier plain year search
+    missed (24 more mentions on the 2025-04-10 extraction)"""
+    # Extract all years and the ends of year ranges from content
+    dates = extract_date_table(df['content'])
+    all_years = np.concatenate([dates['year'].to_numpy(), dates['end_year'].dropna().to_numpy(dtype=int)])
+    
+    # Filter valid range and count frequency of each year, sorted by year
+    all_years = all_years[(all_years >= 1850) & (all_years <= 2025)]
+    years, counts = np.unique(all_years, return_counts=True)
+    timeline = dict(zip(years.tolist(), counts.tolist()))
     
     # Identify significant periods
-    zweig_lifetime = {year: count for year, count in timeline.items() if 1881 <= year <= 1942}
-    post_zweig = {year: count for year, count in timeline.items() if year > 1942}
+    lifetime = (years >= 1881) & (years <= 1942)
+    zweig_lifetime = dict(zip(years[lifetime].tolist(), counts[lifetime].tolist()))
+    post_zweig = dict(zip(years[years > 1942].tolist(), counts[years > 1942].tolist()))
     
     logging.info("=== PUBLICATION TIMELINE ===")
     logging.info(f"Years mentioned: {len(timeline)} distinct years")
+    role_counts = dates['role'].value_counts()
+    logging.info(f"Dates per role: {', '.join(f'{role}: {count}' for role, count in role_counts.items())}")
     
-    # Find years with highest frequency
-    top_years = sorted(timeline.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Find years with highest frequency, earlier years first on ties
+    top = np.argsort(-counts, kind='stable')[:10]
+    top_years = list(zip(years[top].tolist(), counts[top].tolist()))
     logging.info("Most frequently mentioned years:")
     for year, count in top_years:
         logging.info(f"{year}: {count} mentions")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regression benchmarks for the cleaning functions of to-klawiter-cleaned.py
+Runs each public cleaning function over fixed fixtures, records ops/sec and peak
+allocations, and compares outputs and performance against benchmark_golden.json.
+
+The fixtures are entries sampled from klawiter_cleaned.csv, with their raw wiki
+content taken from the extraction export. --scale repeats them for synthetic-scale
+runs of the column-wide functions.
+
+    python benchmark-cleaning.py                       # compare outputs against the golden file
+    python benchmark-cleaning.py --check-performance   # also compare ops/sec and peak allocations
+    python benchmark-cleaning.py --update              # record new golden outputs and timings
+
+The outputs are the hard check. Timings and allocations depend on the machine and its
+load, so they only fail the run with --check-performance, against golden numbers
+recorded on the same machine.
+"""
+
+import argparse
+import gc
+import hashlib
+import importlib.util
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLEANER_FILE = os.path.join(SCRIPT_DIR, 'to-klawiter-cleaned.py')
+GOLDEN_FILE = os.path.join(SCRIPT_DIR, 'benchmark_golden.json')
+SAMPLE_FILE = os.path.join(SCRIPT_DIR, 'klawiter_cleaned.csv')
+CONTENT_FILE = os.path.join(SCRIPT_DIR, '..', 'analysis_output', 'zweig_extraction_complete_20250410_1911.csv')
+
+SAMPLE_SIZE = 200
+SAMPLE_SEED = 0
+
+# Each timed repeat runs a benchmark as often as it takes to last at least this long
+MIN_REPEAT_SECONDS = 0.2
+
+# A benchmark runs func over one fixture column, per value or on the whole column
+Benchmark = namedtuple('Benchmark', ['name', 'column', 'per_row'])
+
+BENCHMARKS = [
+    Benchmark('fix_encoding', 'content', True),
+    Benchmark('fix_encoding_deep', 'content', True),
+    Benchmark('remove_wiki_markup', 'content', True),
+    Benchmark('extract_categories', 'content', True),
+    Benchmark('extract_transliterated_title_and_original', 'content', True),
+    Benchmark('extract_original_title', 'content', True),
+    Benchmark('resolve_title', 'content', True),
+    Benchmark('extract_full_bibliographic_entry', 'content', True),
+    Benchmark('extract_content_items', 'content', True),
+    Benchmark('extract_publisher_location_info', 'content', True),
+    Benchmark('extract_page_count', 'content', True),
+    Benchmark('fold_text', 'title', True),
+    Benchmark('minhash_signature', 'clean_content', True),
+    Benchmark('fix_encoding_column', 'content', False),
+    Benchmark('extract_publisher_location_column', 'content', False),
+    Benchmark('extract_page_count_column', 'content', False),
+    Benchmark('extract_content_items_column', 'content', False),
+    Benchmark('extract_date_table', 'content', False),
+    Benchmark('fold_column', 'title', False),
+]
+
+def load_cleaner(path=CLEANER_FILE):
+    """Import to-klawiter-cleaned.py, whose file name is no valid module name.
+    The cleaner opens a log file in the working directory when it is imported, so it is
+    imported from a temporary directory and its file handlers are closed again"""
+    spec = importlib.util.spec_from_file_location('klawiter_cleaner', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    cwd = os.getcwd()
+    root = logging.getLogger()
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.chdir(log_dir)
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            os.chdir(cwd)
+            for handler in [handler for handler in root.handlers if isinstance(handler, logging.FileHandler)]:
+                root.removeHandler(handler)
+                handler.close()
+    # The cleaner logs every step, only its warnings matter here
+    root.setLevel(logging.WARNING)
+    return module
+
+def sample_page_ids(sample_file=SAMPLE_FILE, size=SAMPLE_SIZE, seed=SAMPLE_SEED):
+    """Draw the page_ids of the fixtures from the cleaned dataset"""
+    sample = pd.read_csv(sample_file, usecols=['page_id'])
+    return sorted(sample['page_id'].sample(n=min(size, len(sample)), random_state=seed).tolist())
+
+def load_fixtures(page_ids, sample_file=SAMPLE_FILE, content_file=CONTENT_FILE):
+    """Title and clean content of the fixtures from the cleaned dataset, raw content from the export"""
+    cleaned = pd.read_csv(sample_file, usecols=['page_id', 'title', 'clean_content'],
+                          dtype=object, keep_default_na=False)
+    raw = pd.read_csv(content_file, usecols=['page_id', 'content'], dtype=object, keep_default_na=False)
+    cleaned['page_id'] = cleaned['page_id'].astype(int)
+    raw['page_id'] = raw['page_id'].astype(int)
+    fixtures = cleaned.merge(raw, on='page_id', how='left').set_index('page_id')
+    missing = [page_id for page_id in page_ids if page_id not in fixtures.index]
+    if missing:
+        raise ValueError(f"Fixture page_ids missing from {sample_file}: {missing[:10]}")
+    return fixtures.loc[page_ids].fillna("")
+
+def clear_caches(cleaner):
+    """Empty the caches of the cleaner, so every repeat does the full work"""
+    cleaner.ENCODING_CACHE.entries.clear()
+    cleaner._parse_wiki_markup.cache_clear()
+    cleaner.fold_text.cache_clear()
+
+def _canonical(value):
+    """Text form of an output for hashing, stable across runs"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.to_csv()
+    return repr(value)
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8', 'surrogatepass')).hexdigest()[:12]
+
+def run_benchmark(cleaner, benchmark, fixtures, repeats):
+    """Time a benchmark over the fixtures and measure its peak allocations.
+    Returns ops/sec of the best repeat, peak KiB and the digests of the outputs"""
+    func = getattr(cleaner, benchmark.name)
+    values = fixtures[benchmark.column]
+    run = (lambda: [func(value) for value in values]) if benchmark.per_row else (lambda: func(values))
+    
+    def timed(number):
+        # Like timeit, without garbage collection in the timed loop
+        gc.disable()
+        try:
+            elapsed = 0.0
+            for _ in range(number):
+                clear_caches(cleaner)
+                start = time.perf_counter()
+                output = run()
+                elapsed += time.perf_counter() - start
+        finally:
+            gc.enable()
+        return elapsed, output
+    
+    number = 1
+    elapsed, output = timed(number)
+    while elapsed < MIN_REPEAT_SECONDS:
+        number = max(number * 2, math.ceil(number * MIN_REPEAT_SECONDS / max(elapsed, 1e-6)))
+        elapsed, output = timed(number)
+    best = elapsed / number
+    for _ in range(repeats - 1):
+        best = min(best, timed(number)[0] / number)
+    
+    clear_caches(cleaner)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    if benchmark.per_row:
+        digests = [_digest(_canonical(value)) for value in output]
+        digest = _digest(''.join(digests))
+    else:
+        digests = None
+        digest = _digest(_canonical(output))
+    return {
+        'ops_per_sec': round(len(values) / best, 1) if best > 0 else None,
+        'peak_kib': round(peak / 1024, 1),
+        'digest': digest,
+        'row_digests': digests,
+    }
+
+def benchmark_key(name, scale):
+    return name if scale == 1 else f"{name}@x{scale}"
+
+def compare(key, result, golden, time_threshold, memory_threshold, page_ids, check_performance=False):
+    """Regressions of a result against its golden entry, as messages. Ops/sec and peak
+    allocations only count with check_performance"""
+    problems = []
+    if result['digest'] != golden['digest']:
+        changed = ""
+        if result['row_digests'] and golden.get('row_digests'):
+            ids = [str(page_id) for page_id, new, old in zip(page_ids, result['row_digests'], golden['row_digests']) if new != old]
+            changed = f" for page_ids {', '.join(ids[:10])}{' ...' if len(ids) > 10 else ''}"
+        problems.append(f"{key}: output changed{changed}")
+    if not check_performance:
+        return problems
+    if golden.get('ops_per_sec') and result['ops_per_sec'] < golden['ops_per_sec'] * (1 - time_threshold):
+        problems.append(f"{key}: {result['ops_per_sec']} ops/sec, golden {golden['ops_per_sec']}")
+    if golden.get('peak_kib') and result['peak_kib'] > golden['peak_kib'] * (1 + memory_threshold):
+        problems.append(f"{key}: peak {result['peak_kib']} KiB, golden {golden['peak_kib']} KiB")
+    return problems
+
+def load_golden(path=GOLDEN_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_golden(golden, path=GOLDEN_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark the cleaning functions against golden outputs and timings')
+    parser.add_argument('--update', action='store_true', help='Record the outputs and timings of this run as the golden ones')
+    parser.add_argument('--resample', action='store_true', help='Draw new fixtures instead of the ones in the golden file (with --update)')
+    parser.add_argument('--scale', type=int, default=1, help='Repeat the fixtures this many times for the column-wide functions')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed repeats per benchmark, the best one counts')
+    parser.add_argument('--check-performance', action='store_true', help='Also fail on slower timings and larger allocations than the golden ones, recorded on this machine')
+    parser.add_argument('--time-threshold', type=float, default=0.3, help='With --check-performance, fail if ops/sec drop by more than this fraction')
+    parser.add_argument('--memory-threshold', type=float, default=0.3, help='With --check-performance, fail if peak allocations grow by more than this fraction')
+    parser.add_argument('--only', nargs='*', default=None, help='Names of the benchmarks to run')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    golden = load_golden()
+    if golden is None and not args.update:
+        print(f"No golden file at {GOLDEN_FILE}, run with --update first")
+        return 1
+    
+    if golden is None or (args.update and args.resample):
+        golden = {'fixtures': {'size': SAMPLE_SIZE, 'seed': SAMPLE_SEED, 'page_ids': sample_page_ids()}, 'benchmarks': {}}
+    page_ids = golden['fixtures']['page_ids']
+    
+    cleaner = load_cleaner()
+    fixtures = load_fixtures(page_ids)
+    scaled = pd.concat([fixtures] * args.scale, ignore_index=True) if args.scale > 1 else fixtures
+    
+    problems = []
+    print(f"{'benchmark':<50} {'ops/sec':>12} {'golden':>12} {'peak KiB':>10} {'output':>8}")
+    for benchmark in BENCHMARKS:
+        if args.only and benchmark.name not in args.only:
+            continue
+        # Per-value functions do the same work at any scale
+        if benchmark.per_row and args.scale > 1:
+            continue
+        key = benchmark_key(benchmark.name, args.scale)
+        result = run_benchmark(cleaner, benchmark, scaled, args.repeats)
+        expected = golden['benchmarks'].get(key)
+        if args.update:
+            golden['benchmarks'][key] = result
+            status = 'saved'
+        elif expected is None:
+            status = 'new'
+        else:
+            found = compare(key, result, expected, args.time_threshold, args.memory_threshold, page_ids, args.check_performance)
+            problems.extend(found)
+            status = 'changed' if result['digest'] != expected['digest'] else 'same'
+        expected_ops = expected['ops_per_sec'] if expected else None
+        print(f"{key:<50} {result['ops_per_sec']:>12} {str(expected_ops):>12} {result['peak_kib']:>10} {status:>8}")
+    
+    if args.update:
+        save_golden(golden)
+        print(f"Saved golden outputs and timings to {GOLDEN_FILE}")
+        return 0
+    
+    if problems:
+        print(f"\n{len(problems)} regressions:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
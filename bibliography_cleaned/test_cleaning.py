@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regression tests for to-klawiter-cleaned.py
+
+    python -m pytest test_cleaning.py
+"""
+
+import importlib.util
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CLEANER_FILE = os.path.join(SCRIPT_DIR, 'to-klawiter-cleaned.py')
+EXTRACTION_FILE = os.path.join(SCRIPT_DIR, '..', 'analysis_output', 'zweig_extraction_complete_20250410_1911.csv')
+
+@pytest.fixture(scope='module')
+def cleaner(tmp_path_factory):
+    """Import to-klawiter-cleaned.py, whose file name is no valid module name"""
+    # The cleaner opens its log file in the working directory on import
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('logs'))
+    try:
+        spec = importlib.util.spec_from_file_location('klawiter_cleaner', CLEANER_FILE)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    logging.getLogger().setLevel(logging.WARNING)
+    return module
+
+@pytest.mark.parametrize('text, expected', [
+    ('x &amp;lt; y', 'x &lt; y'),
+    ('&amp;#8211;', '&#8211;'),
+    ('&lt;b&gt;', '<b>'),
+    ('&lsquo;x&#8217;', "'x'"),
+    ('&#91;x&#93;', '[x]'),
+    ('a&nbsp;b', 'a b'),
+    ('&unknown;', '&unknown;'),
+    ('a\x00b\u200bc', 'abc'),
+])
+def test_entities_are_decoded_once(cleaner, text, expected):
+    assert cleaner.fix_encoding(text) == expected
+    assert cleaner.fix_encoding_deep(text) == expected
+    # Later steps repair the text again, that must not decode it a second time
+    assert cleaner.fix_encoding_again(expected) == expected
+
+def test_encoding_signatures_skip_correct_umlauts(cleaner):
+    texts = pd.Series(["Ältere englische Dramen", "Ångest", "CafÃ©", "Ä\x8dapek", "Ã„ltere", "viá¸¥"])
+    mask = cleaner.scan_encoding_signatures(texts)
+    assert mask.tolist()[:2] == [0, 0]
+    assert cleaner.count_encoding_signatures(mask) == {'Ã': 2, 'Ä': 1, 'viá¸': 1}
+
+CONTENTS_ENTRY = (
+    "\\'\\'\\'[1985]: Wenhua Yishu Chubanshe, Beijing\\'\\'\\'\n\n"
+    "\\'\\'Xiangqi de gushi\\'\\'. 260p.\n\n"
+    "\\'\\'\\'Contents:\\'\\'\\'\n"
+    "<lst type=bracket start=1>\n"
+    "Xu [Foreword by Yushu Zhang], pp. 1-6\n"
+    "[[Xiangqi de gushi]] [Schachnovelle. Translated by Yushu Zhang], pp. 7-(66)\n"
+    "Yige moshengnüren de laixin [Brief einer Unbekannten]. Tr. Zhang Yushu, pp. 67-110\n"
+    "</lst>\n"
+    "\\'\\'\\'Anhang\\'\\'\\'\n"
+    "<lst type=bracket start=4>\n"
+    "Nianbiao [Zeittafel]\n"
+    "</lst>\n\n"
+    "\\'\\'\\'Reprinted in:\\'\\'\\'\n"
+    "<lst type=bracket start=1>\n"
+    "[[Ciweige xiaoshuo ji]] [Tianjin, 1982], No. 13, pp. 427-454\n"
+    "</lst>\n\n"
+    "[[Category:Fiction / Collected Stories (Chinese)]]"
+)
+
+def test_content_items_come_from_contents_lists(cleaner):
+    df = pd.DataFrame({
+        'page_id': [7, 8],
+        'content': [CONTENTS_ENTRY, "\\'\\'Schachnovelle\\'\\'. Reprinted in: <lst>\n[[Novellen]], pp. 1-80\n</lst>"],
+    })
+    df['content_items'] = cleaner.extract_content_items_column(df['content'])
+    table = cleaner.build_content_items_table(df)
+    
+    # The reprint lists are no contents, the Anhang continues them
+    expected = pd.DataFrame([
+        (7, 1, 'Xu', 'Foreword by Yushu Zhang', '', '1-6'),
+        (7, 2, 'Xiangqi de gushi', 'Schachnovelle', 'Yushu Zhang', '7-(66)'),
+        (7, 3, 'Yige moshengnüren de laixin', 'Brief einer Unbekannten', 'Zhang Yushu', '67-110'),
+        (7, 4, 'Nianbiao', 'Zeittafel', '', ''),
+    ], columns=cleaner.CONTENT_ITEMS_TABLE_COLUMNS).set_index('entry_id')
+    pd.testing.assert_frame_equal(table, expected)
+
+def _global_names(code):
+    """Global names a function and the functions nested in it refer to"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+def test_stage_code_lists_cover_their_dependencies(cleaner):
+    module = vars(cleaner)
+    for stage in cleaner.CLEANING_STAGES:
+        listed = {id(part) for part in stage.code}
+        pending, seen = [stage.func], set()
+        while pending:
+            func = pending.pop()
+            func = getattr(func, '__wrapped__', func)
+            for name in _global_names(func.__code__) - seen:
+                seen.add(name)
+                value = module.get(name)
+                if isinstance(getattr(value, '__wrapped__', value), types.FunctionType) and value.__module__ == cleaner.__name__:
+                    assert id(value) in listed, f"stage {stage.name} does not list {name}"
+                    pending.append(value)
+                elif isinstance(value, (re.Pattern, list, dict)) and name.isupper():
+                    # Patterns may be listed by their source
+                    assert id(value) in listed or getattr(value, 'pattern', None) in stage.code, \
+                        f"stage {stage.name} does not list {name}"
+
+@pytest.fixture(scope='module')
+def sample_input(tmp_path_factory):
+    """The first entries of the extraction export as input for whole runs of the cleaner"""
+    raw = pd.read_csv(EXTRACTION_FILE, nrows=300)
+    raw['content_cleaned'] = raw['content']
+    path = tmp_path_factory.mktemp('input') / 'input.csv'
+    raw.to_csv(path, index=False)
+    return path
+
+def run_cleaner(input_file, run_dir, name, *options):
+    """Run the cleaner as a script in run_dir, returns the path of its output"""
+    output_file = run_dir / f"{name}.csv"
+    subprocess.run(
+        [sys.executable, CLEANER_FILE, '--input', str(input_file), '--output', str(output_file), *options],
+        cwd=run_dir, check=True, capture_output=True,
+    )
+    return output_file
+
+def rule_counts(input_file, run_dir, name, *options):
+    """Scans and hits per rule of a run with --rule-stats"""
+    stats_file = run_dir / f"{name}_rule_stats.json"
+    run_cleaner(input_file, run_dir, name, '--rule-stats', str(stats_file), *options)
+    with open(stats_file, 'r', encoding='utf-8') as f:
+        stats = json.load(f)
+    return stats['scans'], {rule: counts['hits'] for rule, counts in stats['rules'].items()}
+
+def test_rule_stats_do_not_depend_on_workers_or_caches(sample_input, tmp_path):
+    single = rule_counts(sample_input, tmp_path, 'single', '--cache-dir', '')
+    assert single[0] > 0 and sum(single[1].values()) > 0
+    
+    assert rule_counts(sample_input, tmp_path, 'workers', '--cache-dir', '', '--workers', '2') == single
+    assert rule_counts(sample_input, tmp_path, 'streaming', '--cache-dir', '', '--workers', '2', '--chunksize', '100') == single
+    
+    # A warm cache must not hide the repairs it holds
+    run_cleaner(sample_input, tmp_path, 'cached', '--cache-dir', 'cache')
+    assert rule_counts(sample_input, tmp_path, 'warm', '--cache-dir', 'cache') == single
+
+def test_stage_cache_keeps_the_outputs_of_the_last_run(cleaner, sample_input, tmp_path):
+    stages = len(cleaner.CLEANING_STAGES)
+    stage_dir = tmp_path / 'cache' / 'stages'
+    run_cleaner(sample_input, tmp_path, 'streaming', '--cache-dir', 'cache', '--chunksize', '100')
+    chunk_outputs = set(os.listdir(stage_dir))
+    assert len(chunk_outputs) == 3 * stages
+    
+    # The outputs for other inputs are pruned, also those of the same stage version
+    run_cleaner(sample_input, tmp_path, 'whole', '--cache-dir', 'cache')
+    whole_outputs = set(os.listdir(stage_dir))
+    assert len(whole_outputs) == stages and not whole_outputs & chunk_outputs
+    
+    # Reused outputs are kept
+    run_cleaner(sample_input, tmp_path, 'again', '--cache-dir', 'cache')
+    assert set(os.listdir(stage_dir)) == whole_outputs
+
+def test_streaming_starts_one_worker_pool(cleaner, sample_input, tmp_path, monkeypatch):
+    pools = []
+    start_pool = cleaner.worker_pool
+    monkeypatch.setattr(cleaner, 'worker_pool', lambda *args: pools.append(args) or start_pool(*args))
+    
+    rows = cleaner.clean_zweig_bibliography_streaming(str(sample_input), str(tmp_path / 'streaming.csv'), 100, workers=2)
+    assert rows == 300 and len(pools) == 1
+    assert pd.read_csv(tmp_path / 'streaming.csv').equals(pd.read_csv(run_cleaner(sample_input, tmp_path, 'single', '--cache-dir', '')))
+
+def test_union_find_merges_sets_transitively(cleaner):
+    sets = cleaner.UnionFind(5)
+    sets.union(0, 1)
+    sets.union(3, 1)
+    assert sets.find(0) == sets.find(1) == sets.find(3)
+    assert len({sets.find(0), sets.find(2), sets.find(4)}) == 3
+    assert sets.size[sets.find(0)] == 3
+
+def test_near_duplicates_share_a_cluster(cleaner):
+    text = ("Die Welt von Gestern. Erinnerungen eines Europäers. Stockholm: Bermann-Fischer, "
+            "1942. 491p. Translated into English by Cedar and Eden Paul as The World of Yesterday")
+    signatures = [
+        cleaner.minhash_signature(text),
+        cleaner.minhash_signature("Ungeduld des Herzens. Roman. Stockholm: Bermann-Fischer, 1939. 448p"),
+        cleaner.minhash_signature(text.replace("Yesterday", "Yesterday, 1943")),
+        None,
+    ]
+    clusters, similarity = cleaner.find_near_duplicate_clusters(signatures)
+    assert clusters[0] == clusters[2] == 1
+    assert pd.isna(clusters[1]) and pd.isna(clusters[3])
+    assert similarity[0] == 1.0 and cleaner.NEAR_DUPLICATE_THRESHOLD <= similarity[2] < 1.0
+
+def test_near_duplicate_clusters_merge_transitively(cleaner):
+    # b differs from a and c from b in 15% of the values, so c is 70% like a
+    changed = round(0.15 * cleaner.MINHASH_PERMUTATIONS)
+    a = np.arange(cleaner.MINHASH_PERMUTATIONS, dtype=np.uint64)
+    b = a.copy()
+    b[:changed] += 1000
+    c = b.copy()
+    c[changed:2 * changed] += 1000
+    clusters, similarity = cleaner.find_near_duplicate_clusters([a, b, c, a + 5000])
+    assert list(clusters) == [1, 1, 1, pd.NA]
+    assert similarity[2] < cleaner.NEAR_DUPLICATE_THRESHOLD
+
+def test_redirects_resolve_chains_cycles_and_missing_targets(cleaner):
+    canonical, stats = cleaner.resolve_redirects(
+        page_ids=[1, 2, 3, 4, 5, 6],
+        redirects=[None, "Schachnovelle", "Chess_story#Editions", "Angst", "Amok", "Nowhere"],
+        titles=["Schachnovelle", "", "", "", "", ""],
+        page_titles=["Schachnovelle", "Chess story", "The royal game", "Amok", "Angst", "Brief"],
+    )
+    assert list(canonical) == [1, 1, 1, pd.NA, pd.NA, pd.NA]
+    assert stats == {
+        'redirects': 5, 'resolved': 2, 'chained': 3, 'unresolved': 1, 'in_cycles': 2, 'ambiguous_titles': 0,
+    }
+
+def test_redirects_resolve_against_cleaned_titles(cleaner):
+    # Without page titles only the entries that are no redirects can be targets
+    canonical, stats = cleaner.resolve_redirects([1, 2, 3], [None, "schachnovelle", "Schachnovelle"], ["Schachnovelle", "x", "y"])
+    assert list(canonical) == [1, 1, 1] and stats['resolved'] == 2
+
+def test_translations_link_to_the_entries_of_their_works(cleaner):
+    entries = pd.DataFrame({
+        'page_id': [1, 2, 3, 4, 5],
+        'title': ["Schachnovelle", "Ungeduld des Herzens", "Le joueur d'échecs", "The World of Yesterday", "Schachnovelle"],
+        'original_title': ["", "", "Schachnovelle", "Die Welt von Gestern", ""],
+        'canonical_page_id': pd.array([1, 2, 3, 4, 1], dtype='Int64'),
+    })
+    content_items = pd.DataFrame(
+        {'position': [1, 2], 'original_title': ["Ungeduld des Herzens. Roman", "Amok"]},
+        index=pd.Index([3, 3], name='entry_id'),
+    )
+    links = cleaner.link_translations(entries, content_items)
+    
+    # The redirect is no work, and nothing in the dataset is called Die Welt von Gestern or Amok
+    expected = pd.DataFrame([
+        (3, "", "Schachnovelle", 1, "Schachnovelle", 1.0),
+        (3, 1, "Ungeduld des Herzens. Roman", 2, "Ungeduld des Herzens", 0.75),
+    ], columns=cleaner.WORK_LINK_COLUMNS)
+    pd.testing.assert_frame_equal(links, expected)
+
+def test_spelling_variants_share_an_authority(cleaner):
+    publishers = cleaner.AuthorityIndex('publisher', stopwords=cleaner.PUBLISHER_STOPWORDS)
+    ids = publishers.resolve_column([
+        "Insel-Verlag", "Insel Verlag", "Insel", "S. Fischer Verlag", "S. Fischer", "Khudozhestvennaia literatura",
+        "Khudozhestvennaya literatura", None, "Insel-Verlag", "Sovetskii pisatel'",
+    ])
+    assert list(ids) == [1, 1, 1, 2, 2, 3, 3, pd.NA, 1, 4]
+    assert publishers.labels == ["Insel-Verlag", "S. Fischer Verlag", "Khudozhestvennaia literatura", "Sovetskii pisatel'"]
+    
+    places = cleaner.AuthorityIndex('location', aliases=cleaner.PLACE_ALIASES)
+    assert list(places.resolve_column(["Wien", "Vienna", "Vienne", "München", "Munich", "Moskau", "Wiesbaden"])) == [1, 1, 1, 2, 2, 3, 4]
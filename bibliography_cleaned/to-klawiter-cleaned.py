@@ -1,10 +1,29 @@
 import pandas as pd
+import numpy as np
 import re
 import logging
 import os
 from datetime import datetime
 import unicodedata
 import codecs
+import html
+import hashlib
+import json
+import math
+import argparse
+import multiprocessing
+import csv
+import zlib
+import glob
+import inspect
+import time
+import contextlib
+from collections import Counter, OrderedDict, namedtuple
+from functools import lru_cache
+from html.entities import html5
+
+from zweig_dataset import categorise_columns, read_cleaned_dataset
+from zweig_dates import MONTHS, DATE_PATTERN, REPRINT_CUE_PATTERN, DATE_FIELDS, extract_date_table
 
 # Set up logging
 log_filename = f"zweig_cleaning_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
@@ -27,8 +46,261 @@ def log_dataframe_info(df, description):
     logger.info(f"Missing values:\n{df.isna().sum()}")
     logger.info(f"First 5 rows:\n{df.head().to_string()}")
 
-def fix_encoding(text):
-    """Fix character encoding issues in text with improved support for various scripts"""
+# Characters that stand for the bytes 0x80-0xFF once UTF-8 has been decoded as
+# cp1252, or as latin1 where cp1252 leaves a byte undefined
+MOJIBAKE_BYTES = {}
+for byte in range(0x80, 0x100):
+    MOJIBAKE_BYTES[chr(byte)] = byte
+    try:
+        MOJIBAKE_BYTES[bytes([byte]).decode('cp1252')] = byte
+    except UnicodeDecodeError:
+        pass
+
+# str.translate table that turns mojibake characters back into latin1 ones
+MOJIBAKE_TO_LATIN1 = {ord(char): byte for char, byte in MOJIBAKE_BYTES.items()}
+
+# A UTF-8 multi-byte sequence in its mis-decoded form
+MOJIBAKE_CONTINUATION = '[' + re.escape(''.join(
+    char for char, byte in MOJIBAKE_BYTES.items() if byte < 0xC0
+)) + ']'
+MOJIBAKE_SEQUENCE = (
+    '[\xc2-\xdf]' + MOJIBAKE_CONTINUATION +
+    '|[\xe0-\xef]' + MOJIBAKE_CONTINUATION + '{2}'
+    '|[\xf0-\xf4]' + MOJIBAKE_CONTINUATION + '{3}'
+)
+
+# Literal encoding rules live in a versioned rules file next to this script.
+# Mojibake sequences are repaired at byte level; these rules override that
+# repair for known cases it cannot handle (see the file's description).
+ENCODING_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'encoding_rules.json')
+
+def load_encoding_rules(path=ENCODING_RULES_FILE):
+    """Load the encoding rules file, rejecting duplicate and no-op rules"""
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    
+    seen = set()
+    for rule in rules['replacements'] + rules['unescaped_replacements']:
+        if rule['source'] in seen:
+            raise ValueError(f"Duplicate encoding rule for {rule['source']!r} in {path}")
+        if rule['source'] == rule['target']:
+            raise ValueError(f"Encoding rule for {rule['source']!r} in {path} does not change anything")
+        seen.add(rule['source'])
+    
+    logger.info(f"Loaded encoding rules version {rules['version']} from {path}")
+    return rules
+
+ENCODING_RULES = load_encoding_rules()
+
+# Literal rules in order of precedence; they do not apply after a backslash
+ENCODING_REPLACEMENTS = [(rule['source'], rule['target']) for rule in ENCODING_RULES['replacements']]
+
+# Rules that give way to an earlier rule or a complete mojibake sequence
+# matching inside or right after them
+ENCODING_LOOKAHEADS = {}
+for rule in ENCODING_RULES['replacements']:
+    if rule.get('not_before_mojibake'):
+        ENCODING_LOOKAHEADS[rule['source']] = MOJIBAKE_CONTINUATION
+    elif rule.get('not_before'):
+        ENCODING_LOOKAHEADS[rule['source']] = '|'.join(map(re.escape, rule['not_before']))
+
+# Repairs that apply even after a backslash
+UNESCAPED_REPLACEMENTS = [(rule['source'], rule['target']) for rule in ENCODING_RULES['unescaped_replacements']]
+
+# Characters that are removed outright, in one str.translate over the repaired text.
+# Most texts have none, the search spares them the translate
+ENCODING_DELETIONS = ENCODING_RULES['deletions']
+DELETION_TABLE = str.maketrans('', '', ''.join(ENCODING_DELETIONS))
+DELETION_PATTERN = re.compile('[' + re.escape(''.join(ENCODING_DELETIONS)) + ']')
+
+# Named entities of the full HTML5 set and numeric character references. Each one is
+# decoded once, so an escaped entity (&amp;lt;) keeps one level of escaping (&lt;)
+HTML_ENTITY_PATTERN = r'&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});'
+
+# Mappings for decoded entities, e.g. no-break spaces and curly quotes to ASCII
+ENTITY_MAPPINGS = ENCODING_RULES['entity_mappings']
+ENTITY_TABLE = str.maketrans(ENTITY_MAPPINGS)
+
+# Changes whenever the encoding rules do, so results cached by an older rule set are not reused
+ENCODING_RULES_VERSION = f"v{ENCODING_RULES['version']}-" + hashlib.sha1(repr((
+    ENCODING_REPLACEMENTS, sorted(ENCODING_LOOKAHEADS.items()), UNESCAPED_REPLACEMENTS, ENCODING_DELETIONS,
+    HTML_ENTITY_PATTERN, sorted(ENTITY_MAPPINGS.items()),
+)).encode('utf-8', 'surrogatepass')).hexdigest()[:12]
+
+def _compile_encoding_pattern(entities=True):
+    """Compile all encoding repairs into a single alternation. Without entities,
+    HTML entities are left as they are"""
+    deletions = '[' + re.escape(''.join(ENCODING_DELETIONS)) + ']'
+    
+    # Everything that ends up as a double quote: plain and escaped quotes, quote
+    # entities and mojibake quotes. Two of them in a row collapse into one.
+    quote = (
+        r'(?:\\(?:\\|' + deletions + ')*)?'
+        r'(?:"|' + (r'&ldquo;|&rdquo;|&#8220;|&#8221;|' if entities else '') +
+        r'(?<!\\)(?:Ã¢|â)€(?:œ|\x9d|Å"(?!\'Ä€lam|\'Ālam)|(?!' + MOJIBAKE_CONTINUATION + ')))'
+    )
+    
+    guarded = []
+    for source, _ in ENCODING_REPLACEMENTS:
+        literal = re.escape(source)
+        if source in ENCODING_LOOKAHEADS:
+            literal += '(?!' + ENCODING_LOOKAHEADS[source] + ')'
+        guarded.append(literal)
+    unescaped = [re.escape(source) for source, _ in UNESCAPED_REPLACEMENTS]
+    
+    # Checking the first character up front lets the scan skip plain text quickly
+    first_chars = {source[0] for source, _ in ENCODING_REPLACEMENTS + UNESCAPED_REPLACEMENTS}
+    first_chars.update('"\\&', map(chr, range(0xc2, 0xf5)))
+    
+    return re.compile(
+        '(?=[' + re.escape(''.join(sorted(first_chars))) + '])'
+        r'(?:(?<!\\)(?:' + '|'.join(guarded) + ')'
+        r'|(?P<quote>' + quote + '(?:' + deletions + '*' + quote + ')?)'
+        r'|' + '|'.join(unescaped) +
+        (r'|(?P<entity>' + HTML_ENTITY_PATTERN + ')' if entities else '') +
+        r'|(?<!\\)(?P<mojibake>' + MOJIBAKE_SEQUENCE + '))'
+    )
+
+def _compile_encoding_triggers():
+    """Compile a pattern that finds every spot where ENCODING_PATTERN would
+    change the text. Unlike ENCODING_PATTERN it does not match lone quotes."""
+    deletions = '[' + re.escape(''.join(ENCODING_DELETIONS)) + ']'
+    guarded = [re.escape(source) for source, _ in ENCODING_REPLACEMENTS]
+    unescaped = [re.escape(source) for source, _ in UNESCAPED_REPLACEMENTS]
+    
+    first_chars = {source[0] for source, _ in ENCODING_REPLACEMENTS + UNESCAPED_REPLACEMENTS}
+    first_chars.update('"\\&', ENCODING_DELETIONS, map(chr, range(0xc2, 0xf5)))
+    
+    return re.compile(
+        '(?=[' + re.escape(''.join(sorted(first_chars))) + '])'
+        r'(?:(?<!\\)(?:' + '|'.join(guarded) + r'|â€|' + MOJIBAKE_SEQUENCE + ')'
+        r'|\\+"|""|' + HTML_ENTITY_PATTERN +
+        r'|' + '|'.join(unescaped) +
+        r'|' + deletions + ')'
+    )
+
+ENCODING_PATTERN = _compile_encoding_pattern()
+ENCODING_PATTERN_WITHOUT_ENTITIES = _compile_encoding_pattern(entities=False)
+ENCODING_TRIGGERS = _compile_encoding_triggers()
+ENCODING_TABLE = dict(ENCODING_REPLACEMENTS + UNESCAPED_REPLACEMENTS)
+
+def repair_mojibake(sequence):
+    """Turn a UTF-8 sequence that was decoded as cp1252/latin1 back into its character"""
+    try:
+        return sequence.translate(MOJIBAKE_TO_LATIN1).encode('latin1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return sequence
+
+def decode_html_entity(entity):
+    """Decode a single HTML entity or character reference. Unknown names are kept as they are"""
+    if entity[1] == '#':
+        decoded = html.unescape(entity)
+    else:
+        decoded = html5.get(entity[1:], entity)
+    return decoded.translate(ENTITY_TABLE)
+
+class EncodingRuleStats:
+    """Hits per encoding rule across a run, to find rules worth pruning or tuning.
+    Literal rules are named by their source text, the others 'quote', 'entity' or 'mojibake'.
+    Deletions run through str.translate and are not counted. All rules are matched in one
+    scan, so time is only measured for the scans as a whole, not per rule. Nothing is
+    recorded or timed unless enable_rule_stats was called"""
+    
+    def __init__(self):
+        self.enabled = False
+        self._reset()
+    
+    def _reset(self):
+        self.hits = Counter()
+        self.scans = 0
+        self.scan_seconds = 0.0
+    
+    def record(self, rule):
+        self.hits[rule] += 1
+    
+    def record_scan(self, seconds):
+        self.scans += 1
+        self.scan_seconds += seconds
+    
+    def export(self):
+        """Hand over the statistics gathered since the last export, e.g. from a worker process"""
+        exported = (self.hits, self.scans, self.scan_seconds)
+        self._reset()
+        return exported
+    
+    def merge(self, exported):
+        """Add the statistics exported by another instance"""
+        hits, scans, scan_seconds = exported
+        self.hits.update(hits)
+        self.scans += scans
+        self.scan_seconds += scan_seconds
+    
+    def unused_rules(self):
+        """Rules from the rules file that did not fire"""
+        sources = [source for source, _ in ENCODING_REPLACEMENTS + UNESCAPED_REPLACEMENTS]
+        return [source for source in sources if not self.hits[source]]
+    
+    def log_report(self, top=15):
+        logger.info(f"Encoding rules: {self.scans} scans in {self.scan_seconds:.2f}s, "
+                    f"{sum(self.hits.values())} repairs")
+        for rule, hits in self.hits.most_common(top):
+            logger.info(f"  {rule!r}: {hits} hits")
+        logger.info(f"Encoding rules without hits in this run: {self.unused_rules()}")
+    
+    def save(self, path):
+        """Write the statistics to a JSON file"""
+        stats = {
+            'rules_version': ENCODING_RULES_VERSION,
+            'scans': self.scans,
+            'scan_seconds': self.scan_seconds,
+            'rules': {rule: {'hits': hits} for rule, hits in self.hits.most_common()},
+            'unused_rules': self.unused_rules(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+        logger.info(f"Saved encoding rule statistics to {path}")
+
+ENCODING_RULE_STATS = EncodingRuleStats()
+
+def _encoding_repair(match):
+    """The rule and the repair for a single match of ENCODING_PATTERN"""
+    if match.lastgroup == 'quote':
+        return 'quote', '"'
+    if match.lastgroup == 'mojibake':
+        return 'mojibake', repair_mojibake(match.group())
+    if match.lastgroup == 'entity':
+        return 'entity', decode_html_entity(match.group())
+    rule = match.group()
+    return rule, ENCODING_TABLE[rule]
+
+def _encoding_replacement(match):
+    """Look up the repair for a single match of ENCODING_PATTERN, counted if rule statistics are on"""
+    rule, replacement = _encoding_repair(match)
+    if ENCODING_RULE_STATS.enabled:
+        ENCODING_RULE_STATS.record(rule)
+    return replacement
+
+def needs_encoding_repair(text):
+    """Tell whether fix_encoding_deep could change the text, without running the repairs"""
+    if not isinstance(text, str):
+        return True
+    
+    if not text.isascii():
+        if not unicodedata.is_normalized('NFC', text):
+            return True
+        
+        # The whole string may be UTF-8 that was decoded as latin1
+        try:
+            text.encode('latin1').decode('utf-8')
+            return True
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    
+    return ENCODING_TRIGGERS.search(text) is not None
+
+def fix_encoding(text, decode_entities=True):
+    """Fix character encoding issues in text with improved support for various scripts.
+    Without decode_entities, HTML entities are kept, for text that was repaired before"""
     if pd.isna(text):
         return text
     
@@ -46,246 +318,305 @@ def fix_encoding(text):
     # Normalize Unicode to handle different normalization forms
     text = unicodedata.normalize('NFC', text)
     
-    # Fix Cyrillic transliteration
-    text = re.sub(r'(?<!\\)Ä­', 'ĭ', text)  # Fix ĭ (short i with breve) for Cyrillic
-    text = re.sub(r'(?<!\\)iā­', 'iĭ', text)  # Fix common pattern in Russian names
-    text = re.sub(r'(?<!\\)eā­n', 'eĭn', text)  # Fix Bernshteĭn
-    text = re.sub(r'(?<!\\)shteā­', 'shteĭ', text)  # Fix Bernshteĭn
-    text = re.sub(r'(?<!\\)skiā­', 'skiĭ', text)  # Fix Arskiĭ
-    text = re.sub(r'(?<!\\)skiā­\.', 'skiĭ.', text)  # With period
-    
-    # Fix Indic transliteration (enhanced for Hindi/Sanskrit)
-    # Fix common virama issues
-    text = re.sub(r'(?<!\\)viá¸', 'viḍ', text)  # Fix viḍ (d with dot below)
-    text = re.sub(r'(?<!\\)á¸am', 'ḍam', text)  # Fix ḍam
-    text = re.sub(r'(?<!\\)á¹‡a', 'ṇa', text)  # Fix ṇa (n with dot below)
-    text = re.sub(r'(?<!\\)á¹£', 'ṣ', text)  # Fix ṣ (s with dot below)
-    text = re.sub(r'(?<!\\)á¸¥', 'ḥ', text)  # Fix ḥ (h with dot below)
-    text = re.sub(r'(?<!\\)á¹­', 'ṭ', text)  # Fix ṭ (t with dot below)
-    text = re.sub(r'(?<!\\)á¹ƒ', 'ṃ', text)  # Fix ṃ (m with dot below)
-    
-    # Fix for Hindi titles
-    text = re.sub(r'(?<!\\)Bhč', 'Bhā', text)  # Fix Bhā (long a)
-    text = re.sub(r'(?<!\\)č(?=[a-zA-Z])', 'ā', text)  # Fix ā (long a) when followed by letter
-    text = re.sub(r'(?<!\\)ī(?=[a-zA-Z])', 'ī', text)  # Fix ī (long i)
-    text = re.sub(r'(?<!\\)ū(?=[a-zA-Z])', 'ū', text)  # Fix ū (long u)
-    text = re.sub(r'(?<!\\)Mč', 'Mā', text)  # Fix Mā in names
-    text = re.sub(r'(?<!\\)(?<=[a-zA-Z])č', 'ā', text)  # Fix ā when preceded by letter
-    
-    # Fix specific Indic patterns
-    text = re.sub(r'(?<!\\)upanyčso', 'upanyāso', text)  # Fix upanyāso
-    text = re.sub(r'(?<!\\)rūpčntar', 'rūpāntar', text)  # Fix rūpāntar
-    text = re.sub(r'(?<!\\)hindī', 'hindī', text)  # Fix hindī
-    text = re.sub(r'(?<!\\)istuvčrt', 'istuvārt', text)  # Fix istuvārt (Stuart)
-    
-    # Fix Arabic transliteration
-    text = re.sub(r'(?<!\\)Ä€', 'Ā', text)
-    text = re.sub(r'(?<!\\)Ä«', 'ī', text)
-    text = re.sub(r'(?<!\\)Å«', 'ū', text)
-    
-    # Advanced Arabic transliteration fixes
-    text = re.sub(r'(?<!\\)DÄr', 'Dār', text)
-    text = re.sub(r'(?<!\\)MadÄ', 'Madā', text)
-    text = re.sub(r'(?<!\\)ThaqÄfah', 'Thaqāfah', text)
-    text = re.sub(r'(?<!\\)BaghdÄd', 'Baghdād', text)
-    text = re.sub(r'(?<!\\)ÄshiqÄt', 'Āshiqāt', text)
-    text = re.sub(r'(?<!\\)"\'Ālam', "'Ālam", text)
-    text = re.sub(r'(?<!\\)waÊ¾l', "wa'l", text)  # Arabic ain character with connecting letter
-    
-    # Fix German and other European language characters
-    text = re.sub(r'(?<!\\)Ã¤', 'ä', text)
-    text = re.sub(r'(?<!\\)Ã¶', 'ö', text)
-    text = re.sub(r'(?<!\\)Ã¼', 'ü', text)
-    text = re.sub(r'(?<!\\)ÃŸ', 'ß', text)
-    text = re.sub(r'(?<!\\)Ã„', 'Ä', text)
-    text = re.sub(r'(?<!\\)Ã–', 'Ö', text)
-    text = re.sub(r'(?<!\\)Ãœ', 'Ü', text)
-    
-    # Fix common German problematic cases
-    text = re.sub(r'(?<!\\)w re ', 'wäre ', text)  # Fix common "wäre" issue
-    text = re.sub(r'(?<!\\)kongre ', 'kongre', text)  # Part of Antikriegskongreßes
-    text = re.sub(r'(?<!\\)gre es', 'greßes', text)  # Part of Antikriegskongreßes
-    
-    # Fix Spanish and other Latin character issues
-    text = re.sub(r'(?<!\\)Ã¡', 'á', text)
-    text = re.sub(r'(?<!\\)Ã©', 'é', text)
-    text = re.sub(r'(?<!\\)Ã­', 'í', text)
-    text = re.sub(r'(?<!\\)Ã³', 'ó', text)
-    text = re.sub(r'(?<!\\)Ãº', 'ú', text)
-    text = re.sub(r'(?<!\\)Ã±', 'ñ', text)
-    
-    # Fix Portuguese/French specific characters
-    text = re.sub(r'(?<!\\)Ã£', 'ã', text)  # a with tilde
-    text = re.sub(r'(?<!\\)Ãµ', 'õ', text)  # o with tilde
-    text = re.sub(r'(?<!\\)Ã¢', 'â', text)  # a with circumflex
-    text = re.sub(r'(?<!\\)Ãª', 'ê', text)  # e with circumflex
-    text = re.sub(r'(?<!\\)Ã®', 'î', text)  # i with circumflex
-    text = re.sub(r'(?<!\\)Ã´', 'ô', text)  # o with circumflex
-    text = re.sub(r'(?<!\\)Ã»', 'û', text)  # u with circumflex
-    text = re.sub(r'(?<!\\)Ã§', 'ç', text)  # c cedilla
-    
-    # Fix Eastern European characters
-    text = re.sub(r'(?<!\\)Å¡', 'š', text)  # s caron (Czech/Slovak/Slovenian/Croatian)
-    text = re.sub(r'(?<!\\)Å½', 'Ž', text)  # Z caron
-    text = re.sub(r'(?<!\\)Å¾', 'ž', text)  # z caron
-    text = re.sub(r'(?<!\\)Ä', 'č', text)  # c caron
-    text = re.sub(r'(?<!\\)Å™', 'ř', text)  # r caron (Czech)
-    text = re.sub(r'(?<!\\)Å„', 'ń', text)  # n acute (Polish)
-    text = re.sub(r'(?<!\\)Å‚', 'ł', text)  # l with stroke (Polish)
-    
-    # Fix Cyrillic characters
-    text = re.sub(r'(?<!\\)Ä­', 'ĭ', text)  # Cyrillic short i (as in Arskiĭ)
-    text = re.sub(r'(?<!\\)Ð', 'И', text)  # Cyrillic I
-    text = re.sub(r'(?<!\\)Ñ', 'Н', text)  # Cyrillic N
-    
-    # Fix ligatures and special typography
-    text = re.sub(r'(?<!\\)Å"', 'œ', text)  # oe ligature
-    text = re.sub(r'(?<!\\)Ã¦', 'æ', text)  # ae ligature
-    text = re.sub(r'(?<!\\)Å¸', 'ÿ', text)  # y with diaeresis
-    
-    # Fix HTML/XML entities
-    text = re.sub(r'&nbsp;', ' ', text)
-    text = re.sub(r'&mdash;', '—', text)
-    text = re.sub(r'&ndash;', '–', text)
-    text = re.sub(r'&lsquo;', ''', text)
-    text = re.sub(r'&rsquo;', ''', text)
-    text = re.sub(r'&ldquo;', '"', text)
-    text = re.sub(r'&rdquo;', '"', text)
-    text = re.sub(r'&amp;', '&', text)
-    text = re.sub(r'&lt;', '<', text)
-    text = re.sub(r'&gt;', '>', text)
-    
-    # Fix numeric character references
-    text = re.sub(r'&#8211;', '–', text)  # en dash
-    text = re.sub(r'&#8212;', '—', text)  # em dash
-    text = re.sub(r'&#8216;', ''', text)  # left single quote
-    text = re.sub(r'&#8217;', ''', text)  # right single quote
-    text = re.sub(r'&#8220;', '"', text)  # left double quote
-    text = re.sub(r'&#8221;', '"', text)  # right double quote
-    
-    # Fix smart quotes and similar characters
-    text = re.sub(r'(?<!\\)â€™', "'", text)  # right single quote
-    text = re.sub(r'(?<!\\)â€œ', '"', text)  # left double quote
-    text = re.sub(r'(?<!\\)â€', '"', text)   # right double quote
-    text = re.sub(r'(?<!\\)â€"', '-', text)  # en dash
-    text = re.sub(r'(?<!\\)â€"', '—', text)  # em dash
-    text = re.sub(r'(?<!\\)â€¦', '…', text)  # ellipsis
-    
-    # Fix common mojibake patterns for various scripts
-    text = re.sub(r'(?<!\\)SadhÃ¢na', 'Sadhâna', text)  # Sanskrit/Hindi term
-    
-    # Fix specific known patterns from the examples
-    text = re.sub(r'\\\'\Ālam', "'Ālam", text)  # Fix escaped quote with Arabic
-    text = re.sub(r"fī \\'l", "fī 'l", text)    # Fix escaped quote with Arabic
-    
-    # Remove control characters
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    
-    # Fix double-encoded characters (characters encoded twice)
-    text = re.sub(r'(?<!\\)Ã£Â£', 'ã', text)
-    text = re.sub(r'(?<!\\)Ã£Â¢', 'â', text)
-    
-    # Remove zero-width spaces and other invisible characters
-    text = re.sub(r'\u200B', '', text)  # zero-width space
-    text = re.sub(r'\u200C', '', text)  # zero-width non-joiner
-    text = re.sub(r'\u200D', '', text)  # zero-width joiner
-    text = re.sub(r'\u2060', '', text)  # word joiner
-    text = re.sub(r'\uFEFF', '', text)  # byte order mark
-    
-    # Additional cleanup for titles with quotes
-    text = re.sub(r'\\+"', '"', text)  # Remove escaped quotes
-    text = re.sub(r'\\+"', '"', text)  # Sometimes double escaping
-    
-    # Fix doubled quotes in strings (common in CSV processing)
-    text = re.sub(r'(?<!\\)""', '"', text)  # Double quotes to single quotes
-    
-    return text
-
-def fix_encoding_deep(text):
-    """Apply multiple passes of encoding fixes for complex cases"""
+    # Apply all repairs in a single scan of the text
+    pattern = ENCODING_PATTERN if decode_entities else ENCODING_PATTERN_WITHOUT_ENTITIES
+    start = time.perf_counter() if ENCODING_RULE_STATS.enabled else None
+    text = pattern.sub(_encoding_replacement, text)
+    if start is not None:
+        ENCODING_RULE_STATS.record_scan(time.perf_counter() - start)
+    
+    # Remove control and zero-width characters in one pass
+    if DELETION_PATTERN.search(text):
+        text = text.translate(DELETION_TABLE)
+
+    # Repaired sequences may contain combining marks
+    return unicodedata.normalize('NFC', text)
+
+def fix_encoding_deep(text, decode_entities=True):
+    """Apply multiple passes of encoding fixes for complex cases.
+    Entities are only decoded in the first pass, so each of them is decoded once"""
     if pd.isna(text):
         return text
     
+    # Most values are already clean, skip them without running the repairs
+    if not needs_encoding_repair(text):
+        return text
+    
     # Try different encoding schemes for particularly difficult cases
     try:
         # First attempt normal fix
-        fixed_text = fix_encoding(text)
+        fixed_text = fix_encoding(text, decode_entities)
         
         # If we still detect encoding issues, try more aggressive approaches
-        if re.search(r'[Ã|Ä|Å|á¸|á¹|č|ā­]', fixed_text):
+        if ENCODING_TRIGGERS.search(fixed_text):
             # Try to decode as latin1, then utf-8
             try:
                 bytes_text = fixed_text.encode('latin1')
                 decoded = bytes_text.decode('utf-8')
-                fixed_text = fix_encoding(decoded)
+                fixed_text = fix_encoding(decoded, decode_entities=False)
             except (UnicodeEncodeError, UnicodeDecodeError):
                 pass
             
             # Try another pass of fixing
-            fixed_text = fix_encoding(fixed_text)
+            fixed_text = fix_encoding(fixed_text, decode_entities=False)
         
         return fixed_text
     except Exception as e:
         logger.warning(f"Error in deep encoding fix: {str(e)}")
         return text
 
-def remove_wiki_markup(text):
-    """Remove wiki markup from text completely"""
-    if pd.isna(text):
-        return ""
-    
-    # Remove category tags
-    text = re.sub(r'\[\[Category:.*?\]\]', '', text)
-    
-    # Remove DEFAULTSORTKEY tags
-    text = re.sub(r'\{\{DEFAULTSORTKEY:.*?\}\}', '', text)
-    
-    # Replace [[Link|Text]] with just Text
-    text = re.sub(r'\[\[(.*?\|)?(.*?)\]\]', r'\2', text)
-    
-    # Replace <lst...> tags with their content
-    text = re.sub(r'<lst.*?>(.*?)</lst>', r'\1', text, flags=re.DOTALL)
-    
-    # Remove '''text''' (bold)
-    text = re.sub(r"'''(.*?)'''", r'\1', text)
-    
-    # Remove ''text'' (italic)
-    text = re.sub(r"''(.*?)''", r'\1', text)
-    
-    # Remove #REDIRECT
-    text = re.sub(r'#REDIRECT \[\[(.*?)\]\]', r'\1', text)
-    text = re.sub(r'#REDIRECT ', '', text)
+def fix_encoding_again(text):
+    """fix_encoding_deep for text that was repaired before, its entities are not decoded twice"""
+    return fix_encoding_deep(text, decode_entities=False)
+
+def _code_version(*parts):
+    """Hash the source of functions and the text of rules into a short version string"""
+    digest = hashlib.sha1()
+    for part in parts:
+        text = inspect.getsource(part) if callable(part) else repr(part)
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()[:12]
+
+# The rules and functions the encoding repairs depend on
+ENCODING_CODE = [
+    ENCODING_RULES_VERSION, ENCODING_PATTERN.pattern, ENCODING_PATTERN_WITHOUT_ENTITIES.pattern,
+    ENCODING_TRIGGERS.pattern, DELETION_PATTERN.pattern, fix_encoding_deep, fix_encoding_again, fix_encoding,
+    needs_encoding_repair, repair_mojibake, decode_html_entity, _encoding_repair, _encoding_replacement,
+]
+
+# Changes whenever the encoding rules or the repair code do, so results cached by older ones are not reused
+ENCODING_CACHE_VERSION = f"{ENCODING_RULES_VERSION}-{_code_version(*ENCODING_CODE)}"
+
+class NormalisationCache:
+    """Bounded LRU cache in front of a string normalisation function, keyed by a hash of the input.
+    A disabled cache calls the function every time. Only a cache that exports its new entries,
+    in a worker process, keeps track of them"""
+    
+    def __init__(self, func, maxsize=50000, version=ENCODING_CACHE_VERSION):
+        self.func = func
+        self.maxsize = maxsize
+        self.version = version
+        self.enabled = True
+        self.entries = OrderedDict()
+        self.exporting = False
+        self.added = []
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(text):
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+    
+    def __call__(self, text):
+        if not self.enabled or not isinstance(text, str):
+            return self.func(text)
+        
+        key = self.key(text)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        
+        self.misses += 1
+        result = self.func(text)
+        self.entries[key] = result
+        if self.exporting:
+            self.added.append(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return result
+    
+    def path(self, cache_dir):
+        return os.path.join(cache_dir, f"{self.func.__name__}_{self.version}.json")
+    
+    def load(self, cache_dir):
+        """Load the entries saved by an earlier run with the same encoding rules and repair code"""
+        path = self.path(cache_dir)
+        if not os.path.exists(path):
+            logger.info(f"No normalisation cache found at {path}")
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable normalisation cache {path}: {str(e)}")
+            return
+        
+        for key, result in list(entries.items())[-self.maxsize:]:
+            self.entries[key] = result
+        logger.info(f"Loaded {len(entries)} cached normalisation results from {path}")
+    
+    def save(self, cache_dir):
+        """Save the entries so the next run with the same encoding rules and repair code can reuse them"""
+        os.makedirs(cache_dir, exist_ok=True)
+        path = self.path(cache_dir)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        logger.info(f"Saved {len(self.entries)} normalisation results to {path}")
+    
+    def export(self):
+        """Hand over the entries and statistics gathered since the last export, e.g. from a worker process"""
+        exported = (
+            {key: self.entries[key] for key in self.added if key in self.entries},
+            self.hits,
+            self.misses,
+        )
+        self.added = []
+        self.hits = 0
+        self.misses = 0
+        return exported
+    
+    def merge(self, exported):
+        """Take over the entries and statistics exported by another cache"""
+        entries, hits, misses = exported
+        for key, result in entries.items():
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        self.hits += hits
+        self.misses += misses
+    
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(hit_rate, 1),
+            'entries': len(self.entries),
+        }
+
+ENCODING_CACHE = NormalisationCache(fix_encoding_deep)
+REPAIRED_ENCODING_CACHE = NormalisationCache(fix_encoding_again)
+ENCODING_CACHES = [ENCODING_CACHE, REPAIRED_ENCODING_CACHE]
+
+def enable_rule_stats():
+    """Record hits per encoding rule and the time of the scans in ENCODING_RULE_STATS. A cached repair would
+    hide the rule hits it stands for, so the normalisation caches are bypassed"""
+    ENCODING_RULE_STATS.enabled = True
+    for cache in ENCODING_CACHES:
+        cache.enabled = False
+
+def fix_encoding_column(values, cache=ENCODING_CACHE):
+    """Apply fix_encoding_deep to a whole column, only visiting the values that need it.
+    Columns that were repaired before go through REPAIRED_ENCODING_CACHE instead"""
+    needs_repair = values.map(lambda x: isinstance(x, (str, bytes)) and needs_encoding_repair(x)).astype(bool)
+    if not needs_repair.any():
+        return values
+    
+    repaired = values.astype(object)
+    repaired[needs_repair] = values[needs_repair].map(cache)
+    return repaired
+
+# Wiki markup rules, applied in this order when an entry is parsed
+WIKI_CATEGORY_PATTERN = re.compile(r'\[\[Category:(.*?)\]\]')
+WIKI_SORTKEY_PATTERN = re.compile(r'\{\{DEFAULTSORTKEY:(.*?)\}\}')
+# A link starts at the last two of a run of brackets, so a decoded &#91; before it stays text
+WIKI_LINK_PATTERN = re.compile(r'\[\[(?!\[)(.*?\|)?(.*?)\]\]')
+WIKI_LIST_PATTERN = re.compile(r'<lst.*?>(.*?)</lst>', re.DOTALL)
+WIKI_BOLD_PATTERN = re.compile(r"'''(.*?)'''")
+WIKI_ITALIC_PATTERN = re.compile(r"''(.*?)''")
+WIKI_REDIRECT_PATTERN = re.compile(r'#REDIRECT \[\[(.*?)\]\]')
+
+# Parsed entries kept in memory, enough for the whole bibliography in both content columns
+WIKI_PARSE_CACHE_SIZE = 16384
+
+WikiEntry = namedtuple('WikiEntry', ['text', 'categories', 'sortkey', 'lists', 'redirect'])
+EMPTY_WIKI_ENTRY = WikiEntry("", (), None, (), None)
+
+# A list of an entry, with the last line before it as its heading ("Contents:", "Reprinted in:")
+WikiList = namedtuple('WikiList', ['heading', 'lines'])
+
+def _collect(tokens, pattern, text, token=lambda match: match.group(1), replacement=lambda match: match.group(1)):
+    """Substitute every match of a markup rule, recording a token for each one"""
+    def replace(match):
+        tokens.append(token(match))
+        return replacement(match)
+    return pattern.sub(replace, text)
+
+def _list_token(match):
+    # The heading is the last line before the list, a list right after another has none
+    before = match.string[:match.start()].rsplit('</lst>', 1)[-1]
+    heading = [line for line in before.split('\n') if line.strip()]
+    lines = [line for line in match.group(1).split('\n') if line.strip()]
+    return WikiList(heading[-1] if heading else "", tuple(lines))
+
+def plain_wiki_text(text):
+    """Plain text of a single line of wiki markup, such as a list line or heading:
+    escaped quotes, bold, italic and surplus whitespace removed"""
+    if '\\' in text:
+        text = text.replace('\\"', '"').replace("\\'", "'")
+    if "''" in text:
+        text = WIKI_ITALIC_PATTERN.sub(r'\1', WIKI_BOLD_PATTERN.sub(r'\1', text))
+    return ' '.join(text.split())
+
+@lru_cache(maxsize=WIKI_PARSE_CACHE_SIZE)
+def _parse_wiki_markup(text):
+    categories, sortkeys, lists = [], [], []
+    
+    redirect = None
+    if text.startswith('#REDIRECT'):
+        match = WIKI_REDIRECT_PATTERN.search(text)
+        if match:
+            redirect = match.group(1)
+    
+    # Each rule only runs when its markup can occur in the entry
+    if '[[Category:' in text:
+        text = _collect(categories, WIKI_CATEGORY_PATTERN, text, replacement=lambda match: '')
+    if '{{DEFAULTSORTKEY:' in text:
+        text = _collect(sortkeys, WIKI_SORTKEY_PATTERN, text, replacement=lambda match: '')
+    if '[[' in text:
+        text = WIKI_LINK_PATTERN.sub(r'\2', text)
+    if '<lst' in text:
+        text = _collect(lists, WIKI_LIST_PATTERN, text, token=_list_token)
+    if "'''" in text:
+        text = WIKI_BOLD_PATTERN.sub(r'\1', text)
+    if "''" in text:
+        text = WIKI_ITALIC_PATTERN.sub(r'\1', text)
+    if '#REDIRECT ' in text:
+        text = WIKI_REDIRECT_PATTERN.sub(r'\1', text)
+        text = text.replace('#REDIRECT ', '')
     
     # Remove escaped quotes
-    text = re.sub(r'\\"', '"', text)
-    text = re.sub(r"\\'", "'", text)
-    
-    # Clean up newlines and extra spaces - replace with spaces
-    text = re.sub(r'\n+', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Final cleanup
-    return text.strip()
+    if '\\' in text:
+        text = text.replace('\\"', '"').replace("\\'", "'")
+    
+    # Collapse newlines and runs of whitespace into single spaces
+    text = ' '.join(text.split())
+    
+    return WikiEntry(
+        text=text,
+        categories=tuple(categories),
+        sortkey=sortkeys[0].strip() if sortkeys else None,
+        lists=tuple(lists),
+        redirect=redirect,
+    )
+
+def parse_wiki_markup(text):
+    """Parse the wiki markup of an entry into its categories, sort key, lists, redirect
+    target and plain text. Parses are cached, so the extractors below share a single
+    parse per entry"""
+    if pd.isna(text):
+        return EMPTY_WIKI_ENTRY
+    return _parse_wiki_markup(text)
+
+def remove_wiki_markup(text):
+    """Remove wiki markup from text completely"""
+    return parse_wiki_markup(text).text
 
 def extract_categories(text):
     """Extract categories from wiki markup"""
-    if pd.isna(text):
-        return []
-    categories = re.findall(r'\[\[Category:(.*?)\]\]', text)
-    return categories
+    return list(parse_wiki_markup(text).categories)
 
 def extract_redirect_target(text):
     """Extract clean redirect target without markup"""
-    if pd.isna(text):
-        return None
-    if not text.startswith('#REDIRECT'):
-        return None
-    
-    # Extract content between [[ and ]]
-    match = re.search(r'#REDIRECT \[\[(.*?)\]\]', text)
-    if match:
-        return match.group(1)
-    return None
+    return parse_wiki_markup(text).redirect
+
+def extract_sortkey(text):
+    """Extract the {{DEFAULTSORTKEY:...}} of an entry, None if it has none"""
+    return parse_wiki_markup(text).sortkey
 
 def get_main_category(categories):
     """Get main category classification based on first segment before '/'"""
@@ -298,26 +629,19 @@ def get_main_category(categories):
 
 def assign_time_period(year):
     """Assign a time period based on the publication year"""
-    if pd.isna(year):
-        return ""
-    
-    try:
-        year = float(year)
-        
-        if year < 1881:
-            return "Pre-Zweig (before 1881)"
-        elif 1881 <= year <= 1942:
-            return "During Lifetime (1881-1942)"
-        elif 1942 < year <= 1980:
-            return "Post-WWII (1943-1980)"
-        elif 1980 < year <= 2000:
-            return "Late 20th Century (1981-2000)"
-        elif year > 2000:
-            return "Contemporary (after 2000)"
-        else:
-            return ""
-    except (ValueError, TypeError):
-        return ""
+    return assign_time_period_column([year]).iloc[0]
+
+# Rules a title can come from, as named in the title_source column. The first four
+# find the transliterated title, the others are fallbacks of the title resolver
+TITLE_SOURCES = [
+    'contents',
+    'title_bracket',
+    'contents_after_bracket',
+    'first_sentence',
+    'redirect',
+    'original_title',
+    'fallback',
+]
 
 def extract_transliterated_title_and_original(content):
     """Extract both transliterated title and original title from content,
@@ -326,8 +650,10 @@ def extract_transliterated_title_and_original(content):
         return "", ""
     
     # Clean the content of unnecessary markup for easier processing
-    clean_content = remove_wiki_markup(content)
-    
+    return _match_titles(remove_wiki_markup(content))[:2]
+
+def _match_titles(clean_content):
+    """Transliterated and original title of an entry without markup, and the rule that found them"""
     # First check for transliterated titles in the Contents section
     contents_pattern = re.search(r'Contents\s*\n(.*?)(?:\n\n|\Z)', clean_content, re.DOTALL | re.IGNORECASE)
     
@@ -352,7 +678,7 @@ def extract_transliterated_title_and_original(content):
                         original_titles.append(clean_orig)
             
             if main_titles:
-                return " * ".join(main_titles), " * ".join(original_titles)
+                return " * ".join(main_titles), " * ".join(original_titles), 'contents'
     
     # Pattern for detecting content with original title in brackets after the title
     title_with_original_pattern = re.search(r'^([^[]+)\s*\[(.*?)\]', clean_content)
@@ -360,7 +686,7 @@ def extract_transliterated_title_and_original(content):
     if title_with_original_pattern:
         transliterated_title = title_with_original_pattern.group(1).strip()
         original_title = title_with_original_pattern.group(2).strip()
-        return transliterated_title, original_title
+        return transliterated_title, original_title, 'title_bracket'
     
     # Check for bracketed content at the beginning which might be the original title
     bracket_at_start = re.match(r'^\s*\[(.*?)\]', clean_content)
@@ -375,20 +701,35 @@ def extract_transliterated_title_and_original(content):
             if item_matches and len(item_matches) >= 2:
                 # Create combined title from first two content items
                 combined_title = " * ".join([item.strip() for item in item_matches[:2]])
-                return combined_title, original_title
+                return combined_title, original_title, 'contents_after_bracket'
     
     # Default fall back to simpler extraction
     bracket_match = re.search(r'\[(.*?)\]', clean_content)
     if bracket_match:
-        return "", bracket_match.group(1)
+        return "", bracket_match.group(1), 'original_title'
     
     # Most basic extraction
     if '.' in clean_content:
         parts = re.split(r'(?<!\w)\.(?!\w)', clean_content)
         title_candidate = parts[0].strip()
-        return title_candidate, ""
+        return title_candidate, "", 'first_sentence'
     else:
-        return clean_content.strip(), ""
+        return clean_content.strip(), "", 'first_sentence'
+
+def _fallback_title(clean_content):
+    """First sentence of an entry without markup, shortened to ten words if it is too long"""
+    if '.' in clean_content:
+        parts = re.split(r'(?<!\w)\.(?!\w)', clean_content)
+        title_candidate = parts[0].strip()
+    else:
+        title_candidate = clean_content.strip()
+    
+    # If title is too long, truncate it
+    if len(title_candidate) > 100:
+        words = title_candidate.split()
+        title_candidate = ' '.join(words[:10]) + "..."
+    
+    return title_candidate
 
 def extract_title(row):
     """Extract and clean a title from the content, with improved handling of translated works"""
@@ -415,20 +756,36 @@ def extract_title(row):
         return ""
     
     # Extract the first sentence or up to first period for a title
-    content = remove_wiki_markup(content)
-    
-    if '.' in content:
-        parts = re.split(r'(?<!\w)\.(?!\w)', content)
-        title_candidate = parts[0].strip()
+    return _fallback_title(remove_wiki_markup(content))
+
+def resolve_title(content_cleaned, content=None, redirect=None):
+    """Resolve the title, transliterated title and original title of an entry in one pass.
+    The transliterated title comes first, then the redirect target, the original title and
+    the first sentence of the entry. Returns (title, transliterated_title, original_title,
+    title_source), title_source names the rule from TITLE_SOURCES the title came from"""
+    clean_content = "" if pd.isna(content_cleaned) else remove_wiki_markup(content_cleaned)
+    transliterated_title, matched_original, source = _match_titles(clean_content)
+    
+    # For entries without a clear transliterated or original title, look for
+    # bracketed text in the raw content
+    original_title = matched_original
+    if not transliterated_title and not matched_original and content is not None:
+        original_title = extract_original_title(content)
+    original_title = _strip_title_brackets(original_title)
+    
+    # Use transliterated title as primary when available
+    if transliterated_title:
+        title = transliterated_title
+    elif not pd.isna(redirect):
+        title, source = remove_wiki_markup(redirect), 'redirect'
+    elif matched_original:
+        title, source = matched_original, 'original_title'
+    elif pd.isna(content_cleaned):
+        title = ""
     else:
-        title_candidate = content.strip()
+        title, source = _fallback_title(clean_content), 'fallback'
     
-    # If title is too long, truncate it
-    if len(title_candidate) > 100:
-        words = title_candidate.split()
-        title_candidate = ' '.join(words[:10]) + "..."
-    
-    return title_candidate
+    return title, transliterated_title, original_title, source if title else ""
 
 def format_categories(categories_list):
     """Format categories list into a readable string"""
@@ -505,84 +862,78 @@ def extract_full_bibliographic_entry(content):
         
     return entry.strip()
 
+# Lists under a contents heading are the items of an entry, sub-headings ("Anhang",
+# "Part One") continue the contents until a heading of another kind of list
+CONTENTS_HEADING_PATTERN = re.compile(r'\bcontents\b', re.IGNORECASE)
+NON_CONTENTS_HEADING_PATTERN = re.compile(
+    r'^(?:\[\d|reprint|printed|published|reviews?\b|excerpts?\b|see also|.*\btranslation\b)|\bin:?$',
+    re.IGNORECASE,
+)
+CONTENT_ITEM_PAGES_PATTERN = re.compile(r',?\s*\bpp?\.\s*(\(?\d+\)?(?:-\(?\d+\)?)?)')
+CONTENT_ITEM_TRANSLATOR_PATTERN = re.compile(r'\.?\s*\b(?:[Tt]ranslated by|[Tt]ranslation by|[Tt]rans\.|[Tt]r\.)\s+(.*?)\.?$')
+
+def content_item_lines(content):
+    """The lines of the contents lists of an entry, with their markup"""
+    lines = []
+    in_contents = False
+    for wiki_list in parse_wiki_markup(content).lists:
+        heading = plain_wiki_text(wiki_list.heading)
+        if CONTENTS_HEADING_PATTERN.search(heading):
+            in_contents = True
+        elif NON_CONTENTS_HEADING_PATTERN.search(heading):
+            in_contents = False
+        if in_contents:
+            lines.extend(wiki_list.lines)
+    return lines
+
 def extract_content_items(content):
-    """Extract content items (chapters, sections, contributions) from the bibliography entry
-    with improved handling of lists and tables of contents"""
+    """Extract content items (chapters, sections, contributions) from the contents lists
+    of the bibliography entry, one item per line"""
     if pd.isna(content):
         return {}, {}, {}, {}
     
-    # Clean the content
-    clean_content = remove_wiki_markup(content)
-    
-    # Look for "Contents" section with multiple pattern matching strategies
-    contents_section = None
-    
-    # 1. Try standard "Contents" header
-    contents_match = re.search(r'[Cc]ontents\s*\n(.*?)(?:\n\n|\Z)', clean_content, re.DOTALL)
-    if contents_match:
-        contents_section = contents_match.group(1)
-    
-    # 2. Try numbered content items directly
-    if not contents_section:
-        numbered_items_match = re.search(r'(?:\n\n|\n)(\d+\.\s+.*?)(?:\n\n|\Z)', clean_content, re.DOTALL)
-        if numbered_items_match:
-            contents_section = numbered_items_match.group(1)
-    
-    # 3. Look for patterns like "1. Title [Original]" even without a Contents header
-    if not contents_section:
-        item_list_match = re.findall(r'(?:\n|^)(\d+\.\s+.*?)(?:\n\d+\.|\Z)', clean_content, re.DOTALL)
-        if item_list_match:
-            contents_section = '\n'.join(item_list_match)
-    
-    # 4. Try entries with a line break format
-    if not contents_section:
-        item_list_match = re.findall(r'(?:\n|^)([^.\n]+)\s*\[.*?\].*?(?:\n|$)', clean_content)
-        if item_list_match and len(item_list_match) > 1:  # At least 2 items to consider it a contents list
-            contents_section = '\n'.join(item_list_match)
-    
     content_items = {}
     content_original_titles = {}
     content_translators = {}
     content_pages = {}
     
-    if contents_section:
-        # Split by numbered items or line breaks
-        items = re.split(r'\n\d+\.|\n-|\n\*|\n', contents_section)
-        items = [item.strip() for item in items if item.strip()]
+    for i, line in enumerate(content_item_lines(content), 1):
+        # Extract translated title, original title, translator, and pages
+        item = plain_wiki_text(line).lstrip('#*: ')
         
-        for i, item in enumerate(items, 1):
-            # Extract translated title, original title, translator, and pages
-            
-            # Look for pages in format "pp. X-Y"
-            pages_match = re.search(r'pp\.\s*(\(?\d+\)?-\d+|\d+)', item)
-            pages = pages_match.group(1) if pages_match else ""
-            
-            # Look for original title in square brackets
-            original_title_match = re.search(r'\[(.*?)\]', item)
-            original_title = original_title_match.group(1) if original_title_match else ""
-            
-            # Look for translator info - expanded patterns
-            translator_match = re.search(r'(?:[Tt]ranslated by|[Tt]r\.)\s+(.*?)[\.,]', item)
-            if not translator_match:
-                translator_match = re.search(r'(?:[Tt]ranslation by|[Tt]rans\.)\s+(.*?)[\.,]', item)
-            translator = translator_match.group(1) if translator_match else ""
-            
-            # Clean up the title by removing the parts we've extracted
-            title = item
-            if original_title:
-                title = re.sub(r'\[.*?\]', '', title)
-            if translator:
-                title = re.sub(r'(?:[Tt]ranslated by|[Tt]r\.|[Tt]ranslation by|[Tt]rans\.)\s+.*?[\.,]', '', title)
-            if pages:
-                title = re.sub(r'pp\.\s*\(?\d+\)?-\d+|\d+', '', title)
-            
-            # Clean up any remaining punctuation and whitespace
-            title = re.sub(r'[,\.:;]+\s*$', '', title.strip())
-            
-            content_items[f"content_item_{i}_title"] = title.strip()
-            content_original_titles[f"content_item_{i}_original_title"] = original_title.strip()
-            content_translators[f"content_item_{i}_translator"] = translator.strip()
-            content_pages[f"content_item_{i}_pages"] = pages.strip()
+        # Look for pages in format "pp. X-Y"
+        pages_match = CONTENT_ITEM_PAGES_PATTERN.search(item)
+        pages = pages_match.group(1) if pages_match else ""
+        
+        # Look for original title in square brackets, it may name the translator
+        original_title_match = re.search(r'\[(.*?)\]', item)
+        original_title = original_title_match.group(1) if original_title_match else ""
+        
+        # Clean up the title by removing the parts we've extracted
+        title = item
+        if original_title_match:
+            title = title[:original_title_match.start()] + title[original_title_match.end():]
+        
+        # Look for translator info in the brackets, then in the rest of the item
+        translator_match = CONTENT_ITEM_TRANSLATOR_PATTERN.search(original_title)
+        if translator_match:
+            original_title = original_title[:translator_match.start()]
+        else:
+            translator_match = re.search(r'\b(?:[Tt]ranslated by|[Tt]ranslation by|[Tt]rans\.|[Tt]r\.)\s+([^,\[\]]+)', title)
+            if translator_match:
+                title = title.replace(translator_match.group(0), '')
+        translator = translator_match.group(1) if translator_match else ""
+        
+        if pages:
+            title = CONTENT_ITEM_PAGES_PATTERN.sub('', title, count=1)
+        
+        # Clean up any remaining punctuation and whitespace
+        title = re.sub(r'[,\.:;]+\s*$', '', ' '.join(title.split()))
+        
+        content_items[f"content_item_{i}_title"] = title.strip()
+        content_original_titles[f"content_item_{i}_original_title"] = original_title.strip()
+        content_translators[f"content_item_{i}_translator"] = translator.strip()
+        content_pages[f"content_item_{i}_pages"] = pages.strip()
     
     return content_items, content_original_titles, content_translators, content_pages
 
@@ -620,29 +971,30 @@ def extract_publisher_location_info(content):
     
     return publisher, location
 
+# Languages recognised in category names, in order of priority
+LANGUAGE_MAP = {
+    "Russian": "Russian",
+    "German": "German",
+    "English": "English",
+    "French": "French",
+    "Spanish": "Spanish",
+    "Italian": "Italian",
+    "Portuguese": "Portuguese",
+    "Japanese": "Japanese",
+    "Chinese": "Chinese",
+    "Arabic": "Arabic",
+    "Hindi": "Hindi",
+    "Sanskrit": "Sanskrit",
+    "Hebrew": "Hebrew"
+}
+
 def extract_language_from_categories(categories):
     """Extract language information from categories"""
     if not categories:
         return ""
     
-    language_map = {
-        "Russian": "Russian",
-        "German": "German",
-        "English": "English",
-        "French": "French",
-        "Spanish": "Spanish",
-        "Italian": "Italian",
-        "Portuguese": "Portuguese",
-        "Japanese": "Japanese",
-        "Chinese": "Chinese",
-        "Arabic": "Arabic",
-        "Hindi": "Hindi",
-        "Sanskrit": "Sanskrit",
-        "Hebrew": "Hebrew"
-    }
-    
     for cat in categories:
-        for lang, lang_name in language_map.items():
+        for lang, lang_name in LANGUAGE_MAP.items():
             if lang in cat:
                 return lang_name
     
@@ -679,38 +1031,140 @@ def extract_page_count(content):
     
     return ""
 
-def clean_zweig_bibliography(input_file, output_file):
-    """Main function to clean the Zweig bibliography dataset with enhanced extraction"""
-    logger.info(f"Starting enhanced cleaning process for file: {input_file}")
-    
-    # 1. Data Loading and Initial Assessment
-    logger.info("Step 1: Loading data and initial assessment")
-    try:
-        df = pd.read_csv(input_file)
-    except UnicodeDecodeError:
-        logger.info("UTF-8 decode error, trying with latin1 encoding")
-        df = pd.read_csv(input_file, encoding='latin1')
-    except Exception as e:
-        logger.error(f"Error loading file: {str(e)}")
-        raise
-        
-    log_dataframe_info(df, "Initial dataset")
-    
-    # 2. Structural Cleaning
-    logger.info("Step 2: Structural cleaning")
-    
-    # Remove unnecessary columns
-    if 'page_title' in df.columns and df['page_title'].isna().all():
-        logger.info("Removing 'page_title' column as it's 100% NULL")
-        df = df.drop(columns=['page_title'])
-    
-    # Fix data types if needed
-    if 'year' in df.columns:
-        logger.info("Converting 'year' column to float type")
-        df['year'] = pd.to_numeric(df['year'], errors='coerce')
-    
-    log_dataframe_info(df, "After structural cleaning")
-    
+# Named-group patterns for the column-wide extractors. Where a field has several patterns
+# they are listed in order of priority and combined with combine_first, as the row-wise
+# extractors above try them one after the other
+# Fields of a content item, in the order of the tuples from extract_content_items_column
+CONTENT_ITEM_FIELDS = ['title', 'original_title', 'translator', 'pages']
+
+CATALOG_NUMBERS_PATTERN = r'^(?P<catalog_number_1>[^,]*),(?P<catalog_number_2>[^,]*)'
+PUBLISHER_PATTERNS = [
+    r':\s+"(?P<publisher>[^"]+)"',
+    r'(?:Izdatel\'stvo|Publishing|Verlag|Éditions)\s+"?(?P<publisher>[^",.]+)"?',
+    r'(?:[A-Z][a-zA-Z\s]+:)?\s*(?P<publisher>[^,]+?)(?:,|\s+\d{4})',
+]
+LOCATION_PATTERNS = [
+    r'(?P<location>[A-Z][a-zA-Z\s]+):',
+    r'(?i)(?:^|\s)(?P<location>Moscow|Moskva|Berlin|London|New York|Paris|Wien|Vienna|Frankfurt|Leipzig)\b',
+]
+PAGE_COUNT_PATTERNS = [
+    r'(?P<page_count>\d+)\s*(?:p\.|pages)',
+    r'(?P<page_count>\d+)/\(\d+\)p\.',
+    r'(?i)(?:total|in all|altogether)\s+(?P<page_count>\d+)\s*(?:p\.|pages)',
+]
+# Categories are joined one per line; at the first line naming a language, the
+# alternatives are tried in the order of LANGUAGE_MAP
+LANGUAGE_PATTERN = '(?m)^(?:' + '|'.join(
+    f'(?=[^\\n]*(?P<language_{i}>{re.escape(lang)}))' for i, lang in enumerate(LANGUAGE_MAP)
+) + ')'
+
+def _stripped_column(contents):
+    """Entries without wiki markup, as the row-wise extractors see them"""
+    return pd.Series(contents).map(remove_wiki_markup).astype(object)
+
+def _extract_first(values, patterns):
+    """Extract the single named group of the first pattern that matches, NaN where none does"""
+    first = values.str.extract(patterns[0], expand=False).str.strip()
+    for pattern in patterns[1:]:
+        # Later patterns only need to look at the rows that are still missing
+        missing = values[first.isna()]
+        first = first.combine_first(missing.str.extract(pattern, expand=False).str.strip())
+    return first
+
+def _column_frame(rows, values, columns=None):
+    """Build the DataFrame for a batch extractor in one go, aligned with the input column"""
+    index = values.index if isinstance(values, pd.Series) else None
+    return pd.DataFrame(rows, index=index, columns=columns)
+
+def _fill_missing(values, fallback):
+    """Keep the values that are present and non-empty, take the fallback for the rest"""
+    present = values.map(lambda x: pd.notna(x) and bool(x)).astype(bool)
+    return values.where(present, fallback)
+
+def extract_catalog_numbers_column(text_ids):
+    """Extract catalog numbers for a whole column of text_ids"""
+    text_ids = pd.Series(text_ids)
+    present = text_ids.notna()
+    values = text_ids.astype(object).where(~present, text_ids[present].astype(str))
+    return values.str.extract(CATALOG_NUMBERS_PATTERN).astype(object).fillna("")
+
+def resolve_titles_column(contents_cleaned, contents, redirects):
+    """Resolve title, transliterated title, original title and title_source for whole columns
+    of cleaned entries, raw entries and redirect targets"""
+    return _column_frame(
+        [resolve_title(*row) for row in zip(contents_cleaned, contents, redirects)],
+        contents_cleaned,
+        ['title', 'transliterated_title', 'original_title', 'title_source'],
+    )
+
+def extract_publisher_location_column(contents):
+    """Extract publisher and location information for a whole column of entries"""
+    stripped = _stripped_column(contents)
+    return pd.DataFrame({
+        'publisher_extracted': _extract_first(stripped, PUBLISHER_PATTERNS).fillna(""),
+        'location_extracted': _extract_first(stripped, LOCATION_PATTERNS).fillna(""),
+    }, index=stripped.index)
+
+def extract_page_count_column(contents):
+    """Extract the page count for a whole column of entries"""
+    return _extract_first(_stripped_column(contents), PAGE_COUNT_PATTERNS).fillna("")
+
+def extract_language_column(categories_lists):
+    """Extract the language for a whole column of category lists"""
+    found = pd.Series(categories_lists).str.join('\n').str.extract(LANGUAGE_PATTERN)
+    # At most one alternative matches per row
+    language = found.bfill(axis=1).iloc[:, 0]
+    return language.map(LANGUAGE_MAP).astype(object).fillna("")
+
+def publication_years(dates, index):
+    """Publication year per row of a date table, the first date of a row if it only has reprints"""
+    first = dates['year'].groupby(level=0).first()
+    publication = dates.loc[dates['role'] == 'publication', 'year'].droplevel(1)
+    return publication.reindex(index).combine_first(first.reindex(index)).astype(float)
+
+def extract_dates_column(dates, index):
+    """The dates of a date table as one list of (year, end_year, month, role) tuples per row"""
+    records = list(zip(
+        dates['year'].tolist(),
+        dates['end_year'].astype(object).where(dates['end_year'].notna(), None).tolist(),
+        dates['month'].astype(object).where(dates['month'].notna(), None).tolist(),
+        dates['role'].tolist(),
+    ))
+    counts = dates.groupby(level=0).size().reindex(index, fill_value=0).to_numpy()
+    ends = np.cumsum(counts)
+    return pd.Series([records[end - count:end] for count, end in zip(counts, ends)], index=index, dtype=object)
+
+TIME_PERIODS = [
+    "Pre-Zweig (before 1881)",
+    "During Lifetime (1881-1942)",
+    "Post-WWII (1943-1980)",
+    "Late 20th Century (1981-2000)",
+    "Contemporary (after 2000)",
+]
+
+def assign_time_period_column(years):
+    """Assign time periods for a whole column of publication years"""
+    years = pd.to_numeric(pd.Series(years), errors='coerce')
+    values = years.to_numpy(dtype=float)
+    # Comparisons with NaN are False, so rows without a year get the default
+    period = np.select([values < 1881, values <= 1942, values <= 1980, values <= 2000, values > 2000],
+                       TIME_PERIODS, default="")
+    return pd.Series(period, index=years.index, dtype=object)
+
+def extract_content_items_column(contents):
+    """Extract content items for a whole column of entries.
+    Each row gets a list with one (title, original_title, translator, pages) tuple per item"""
+    rows = []
+    for content in contents:
+        items, original_titles, translators, pages = extract_content_items(content)
+        rows.append([
+            tuple(fields[f"content_item_{i}_{field}"] for fields, field in zip(
+                (items, original_titles, translators, pages), CONTENT_ITEM_FIELDS))
+            for i in range(1, len(items) + 1)
+        ])
+    return pd.Series(rows, index=contents.index if isinstance(contents, pd.Series) else None, dtype=object)
+
+def _stage_encoding(df):
     # 3. Content Normalization
     logger.info("Step 3: Content normalization")
     
@@ -718,180 +1172,482 @@ def clean_zweig_bibliography(input_file, output_file):
     text_columns = ['content', 'content_cleaned', 'redirect_target', 'content_title']
     text_columns = [col for col in text_columns if col in df.columns]
     
+    repaired = pd.DataFrame(index=df.index)
     for col in text_columns:
         logger.info(f"Fixing character encoding in '{col}' column")
-        df[col] = df[col].apply(fix_encoding_deep)
+        repaired[col] = fix_encoding_column(df[col])
+    logger.info(f"Encoding cache after content normalization: {ENCODING_CACHE.stats()}")
+    return repaired
+
+def _stage_dates(df):
+    # All years and ranges of each entry, the publication year is derived from them
+    logger.info("Extracting dates and publication years")
+    dates = extract_date_table(df['content'])
+    return pd.DataFrame({
+        'dates': extract_dates_column(dates, df.index),
+        'year': publication_years(dates, df.index),
+    }, index=df.index)
+
+def _stage_metadata(df):
+    metadata = pd.DataFrame(index=df.index)
     
     # Create a clean redirect column
     logger.info("Creating clean redirect column")
-    df['redirect'] = df['content'].apply(extract_redirect_target)
+    metadata['redirect'] = df['content'].apply(extract_redirect_target)
+    metadata['sortkey'] = df['content'].apply(extract_sortkey)
     
     # 4. Metadata Enhancement
     logger.info("Step 4: Metadata enhancement")
     
     # Extract categories
     logger.info("Extracting categories from content")
-    df['categories_list'] = df['content'].apply(extract_categories)
+    metadata['categories_list'] = df['content'].apply(extract_categories)
     
     # Format categories as readable text
     logger.info("Formatting categories as readable text")
-    df['categories'] = df['categories_list'].apply(format_categories)
+    metadata['categories'] = metadata['categories_list'].apply(format_categories)
     
     # Add main category classification
     logger.info("Adding main category classification")
-    df['main_category'] = df['categories_list'].apply(get_main_category)
+    metadata['main_category'] = metadata['categories_list'].apply(get_main_category)
     
     # Add time period classification
     logger.info("Adding time period classification")
-    df['time_period'] = df['year'].apply(assign_time_period)
-    
+    metadata['time_period'] = assign_time_period_column(df['year'])
+    return metadata
+
+def _stage_catalog_numbers(df):
     # 5. Enhanced metadata extraction
     logger.info("Step 5: Enhanced metadata extraction")
     
-    # Extract catalog numbers only if they're different from text_id
+    # Extract catalog numbers, merge_extracted_fields drops them if they match text_id
     logger.info("Extracting catalog numbers")
-    catalog_numbers = df.apply(
-        lambda row: pd.Series(extract_catalog_numbers(row.get('text_id', ''))), 
-        axis=1
-    )
-    
-    # Only add catalog numbers columns if they provide new information
-    if not catalog_numbers.empty and (catalog_numbers.iloc[:, 0].astype(str) != "").any():
-        df['catalog_number_1'] = catalog_numbers.iloc[:, 0]
-        df['catalog_number_2'] = catalog_numbers.iloc[:, 1]
-    else:
-        # Skip creating redundant catalog number columns
-        logger.info("Skipping catalog number extraction as they match text_id")
-    
-    # First extract transliterated and original titles together for context
-    logger.info("Extracting transliterated and original titles")
-    titles_extracted = df.apply(
-        lambda row: pd.Series(extract_transliterated_title_and_original(row.get('content_cleaned', ''))),
-        axis=1
-    )
-    
-    # If we have extracted titles successfully, use them
-    if not titles_extracted.empty:
-        df['transliterated_title'] = titles_extracted.iloc[:, 0]
-        df['original_title'] = titles_extracted.iloc[:, 1]
-        
-        # For entries without a clear transliterated title but with an original title,
-        # try to extract the original title with the improved method
-        mask = (df['transliterated_title'] == "") & (df['original_title'] == "")
-        if mask.any():
-            df.loc[mask, 'original_title'] = df.loc[mask, 'content'].apply(extract_original_title)
-        
-        # Clean up original title by removing leftover brackets
-        df['original_title'] = df['original_title'].apply(lambda x: re.sub(r'^\[|\]$', '', x) if isinstance(x, str) else x)
-    else:
-        # If the extraction failed, fall back to the original method
-        logger.info("Falling back to original title extraction method")
-        df['original_title'] = df['content'].apply(extract_original_title)
-        # Clean up original title by removing leftover brackets
-        df['original_title'] = df['original_title'].apply(lambda x: re.sub(r'^\[|\]$', '', x) if isinstance(x, str) else x)
-    
+    return extract_catalog_numbers_column(df.get('text_id', pd.Series('', index=df.index)))
+
+def _strip_title_brackets(title):
+    """Clean up original title by removing leftover brackets"""
+    return re.sub(r'^\[|\]$', '', title) if isinstance(title, str) else title
+
+def _stage_titles(df):
+    # Resolve the transliterated, original and display title of each entry together,
+    # with the rule each title came from
+    logger.info("Resolving titles")
+    return resolve_titles_column(df['content_cleaned'], df['content'], df['redirect'])
+
+def _stage_full_entry(df):
     # Extract full bibliographic entry
     logger.info("Extracting full bibliographic entry")
-    df['full_bibliographic_entry'] = df['content'].apply(extract_full_bibliographic_entry)
-    
+    return pd.DataFrame({'full_bibliographic_entry': df['content'].apply(extract_full_bibliographic_entry)}, index=df.index)
+
+def _stage_publisher_location(df):
     # Extract publisher and location information
     logger.info("Extracting publisher and location information")
-    publisher_location = df.apply(
-        lambda row: pd.Series(extract_publisher_location_info(row.get('content', ''))),
-        axis=1
-    )
+    return extract_publisher_location_column(df['content'])
+
+def _stage_language(df):
+    # Extract language, merge_extracted_fields decides where it is used
+    logger.info("Extracting language information")
+    return pd.DataFrame({'language_extracted': extract_language_column(df['categories_list'])}, index=df.index)
+
+def _stage_page_count(df):
+    # Extract page count, merge_extracted_fields decides where it is used
+    logger.info("Extracting page count")
+    return pd.DataFrame({'page_count_extracted': extract_page_count_column(df['content'])}, index=df.index)
+
+def _stage_content_items(df):
+    # 6. Extract content items
+    logger.info("Step 6: Extracting content items")
     
-    df['publisher_extracted'] = publisher_location.iloc[:, 0]
-    df['location_extracted'] = publisher_location.iloc[:, 1]
+    # Extract content items, original titles, translators, and page ranges
+    return pd.DataFrame({'content_items': extract_content_items_column(df['content'])}, index=df.index)
+
+def _stage_clean_content(df):
+    # 7. Create fully cleaned content
+    logger.info("Step 7: Creating fully cleaned content")
+
+    # Clean content - completely remove wiki markup
+    logger.info("Completely removing wiki markup from content")
+    clean_content = df['content_cleaned'].apply(remove_wiki_markup)
+    
+    # Fix any remaining encoding issues in the clean content, its entities were decoded in step 3
+    return pd.DataFrame({'clean_content': fix_encoding_column(clean_content, REPAIRED_ENCODING_CACHE)}, index=df.index)
+
+# MinHash signatures of clean_content for near-duplicate detection: word shingles are hashed
+# with crc32 (stable across processes) and permuted with (a * x + b) mod MINHASH_PRIME
+MINHASH_SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 128
+MINHASH_PRIME = (1 << 32) + 15
+MINHASH_SEED = 1881
+_minhash_rng = np.random.default_rng(MINHASH_SEED)
+MINHASH_A = _minhash_rng.integers(1, 1 << 32, MINHASH_PERMUTATIONS, dtype=np.uint64)
+MINHASH_B = _minhash_rng.integers(0, 1 << 32, MINHASH_PERMUTATIONS, dtype=np.uint64)
+del _minhash_rng
+
+def shingle_hashes(text):
+    """crc32 hashes of the overlapping word shingles of a text, lower-cased"""
+    if not isinstance(text, str):
+        return np.empty(0, dtype=np.uint64)
+    words = text.lower().split()
+    if len(words) <= MINHASH_SHINGLE_SIZE:
+        shingles = {' '.join(words)} if words else set()
+    else:
+        shingles = {' '.join(words[i:i + MINHASH_SHINGLE_SIZE]) for i in range(len(words) - MINHASH_SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+def minhash_signature(text):
+    """MinHash signature of a text, None for texts without words"""
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    # a * x + b stays below 2**64 for 32-bit a, b and x
+    permuted = (np.outer(hashes, MINHASH_A) + MINHASH_B) % MINHASH_PRIME
+    return permuted.min(axis=0)
+
+def _stage_minhash(df):
+    # Signatures for the near-duplicate detection on the whole dataset
+    logger.info("Computing MinHash signatures of clean content")
+    return pd.DataFrame({'minhash_signature': df['clean_content'].map(minhash_signature)}, index=df.index)
+
+# A row-local cleaning stage: func takes the frame and returns its output columns,
+# code lists the functions and rules whose changes invalidate its cached results
+PipelineStage = namedtuple('PipelineStage', ['name', 'func', 'inputs', 'outputs', 'code'])
+
+ENCODING_STAGE_CODE = ENCODING_CODE + [fix_encoding_column]
+WIKI_MARKUP_CODE = [
+    WIKI_CATEGORY_PATTERN, WIKI_SORTKEY_PATTERN, WIKI_LINK_PATTERN, WIKI_LIST_PATTERN,
+    WIKI_BOLD_PATTERN, WIKI_ITALIC_PATTERN, WIKI_REDIRECT_PATTERN, EMPTY_WIKI_ENTRY, _collect, _list_token,
+    _parse_wiki_markup, parse_wiki_markup, remove_wiki_markup, plain_wiki_text,
+]
+
+CLEANING_STAGES = [
+    PipelineStage('encoding', _stage_encoding,
+                  ['content', 'content_cleaned', 'redirect_target', 'content_title'],
+                  ['content', 'content_cleaned', 'redirect_target', 'content_title'],
+                  ENCODING_STAGE_CODE),
+    PipelineStage('dates', _stage_dates,
+                  ['content'],
+                  ['dates', 'year'],
+                  [MONTHS, DATE_PATTERN, REPRINT_CUE_PATTERN, DATE_FIELDS, extract_date_table, publication_years,
+                   extract_dates_column]),
+    PipelineStage('metadata', _stage_metadata,
+                  ['content', 'year'],
+                  ['redirect', 'sortkey', 'categories_list', 'categories', 'main_category', 'time_period'],
+                  WIKI_MARKUP_CODE + [extract_redirect_target, extract_sortkey, extract_categories, format_categories,
+                                      get_main_category, TIME_PERIODS, assign_time_period_column]),
+    PipelineStage('catalog_numbers', _stage_catalog_numbers,
+                  ['text_id'],
+                  ['catalog_number_1', 'catalog_number_2'],
+                  [CATALOG_NUMBERS_PATTERN, extract_catalog_numbers_column]),
+    PipelineStage('titles', _stage_titles,
+                  ['content', 'content_cleaned', 'redirect'],
+                  ['title', 'transliterated_title', 'original_title', 'title_source'],
+                  WIKI_MARKUP_CODE + [TITLE_SOURCES, _match_titles, _fallback_title, resolve_title,
+                                      resolve_titles_column, extract_original_title, _strip_title_brackets,
+                                      _column_frame]),
+    PipelineStage('full_entry', _stage_full_entry,
+                  ['content'],
+                  ['full_bibliographic_entry'],
+                  WIKI_MARKUP_CODE + [extract_full_bibliographic_entry]),
+    PipelineStage('publisher_location', _stage_publisher_location,
+                  ['content'],
+                  ['publisher_extracted', 'location_extracted'],
+                  WIKI_MARKUP_CODE + [PUBLISHER_PATTERNS, LOCATION_PATTERNS, extract_publisher_location_column,
+                                      _stripped_column, _extract_first]),
+    PipelineStage('language', _stage_language,
+                  ['categories_list'],
+                  ['language_extracted'],
+                  [LANGUAGE_MAP, LANGUAGE_PATTERN, extract_language_column]),
+    PipelineStage('page_count', _stage_page_count,
+                  ['content'],
+                  ['page_count_extracted'],
+                  WIKI_MARKUP_CODE + [PAGE_COUNT_PATTERNS, extract_page_count_column, _stripped_column, _extract_first]),
+    PipelineStage('content_items', _stage_content_items,
+                  ['content'],
+                  ['content_items'],
+                  WIKI_MARKUP_CODE + [CONTENTS_HEADING_PATTERN, NON_CONTENTS_HEADING_PATTERN, CONTENT_ITEM_PAGES_PATTERN,
+                                      CONTENT_ITEM_TRANSLATOR_PATTERN, content_item_lines, extract_content_items,
+                                      extract_content_items_column, CONTENT_ITEM_FIELDS]),
+    PipelineStage('clean_content', _stage_clean_content,
+                  ['content_cleaned'],
+                  ['clean_content'],
+                  WIKI_MARKUP_CODE + ENCODING_STAGE_CODE),
+    PipelineStage('minhash', _stage_minhash,
+                  ['clean_content'],
+                  ['minhash_signature'],
+                  [MINHASH_SHINGLE_SIZE, MINHASH_PERMUTATIONS, MINHASH_PRIME, MINHASH_SEED,
+                   shingle_hashes, minhash_signature]),
+]
+
+STAGE_VERSIONS = {stage.name: _code_version(stage.func, *stage.code) for stage in CLEANING_STAGES}
+
+# Changes whenever any stage does, so rows cleaned by older code are not reused
+CLEANING_VERSION = _code_version(STAGE_VERSIONS)
+
+def _hash_columns(df, columns):
+    """Hash the index and values of the given columns"""
+    digest = hashlib.sha1()
+    for col in columns:
+        digest.update(col.encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df[col].map(repr), index=True).values.tobytes())
+    return digest.hexdigest()[:16]
+
+def _mark_used(path):
+    """Mark a stage output as used by this run, prune_stage_cache keeps it. The time comes
+    from the same clock as the start of the run, not from the file system"""
+    now = time.time()
+    os.utime(path, (now, now))
+
+def run_stage(stage, df, cache_dir=None):
+    """Run a cleaning stage, or load its output from the stage cache if neither its
+    input columns nor its code have changed since it was stored"""
+    if not cache_dir:
+        return stage.func(df)
+    
+    version = STAGE_VERSIONS[stage.name]
+    inputs = [col for col in stage.inputs if col in df.columns]
+    stage_dir = os.path.join(cache_dir, 'stages')
+    path = os.path.join(stage_dir, f"{stage.name}_{version}_{_hash_columns(df, inputs)}.pkl")
+    if os.path.exists(path):
+        logger.info(f"Stage '{stage.name}': reusing cached output")
+        _mark_used(path)
+        return pd.read_pickle(path)
+    
+    outputs = stage.func(df)
+    os.makedirs(stage_dir, exist_ok=True)
+    
+    # Write atomically, other worker processes may be storing results for the same stage
+    partial_path = f"{path}.{os.getpid()}.partial"
+    outputs.to_pickle(partial_path)
+    os.replace(partial_path, path)
+    _mark_used(path)
+    return outputs
+
+def prune_stage_cache(cache_dir, run_started):
+    """Remove the stage outputs that the run started at run_started neither stored nor reused:
+    those of older stage versions and of inputs that have changed since. A run stores one
+    output per stage and chunk, so they can only be told apart once the run is done"""
+    pruned = 0
+    for path in glob.glob(os.path.join(cache_dir, 'stages', '*.pkl')):
+        try:
+            if os.path.getmtime(path) < run_started:
+                os.remove(path)
+                pruned += 1
+        except FileNotFoundError:
+            pass
+    if pruned:
+        logger.info(f"Removed {pruned} stage outputs not used by this run")
+
+def clean_rows(df, cache_dir=None):
+    """Run the row-local cleaning steps (3-7) as CLEANING_STAGES. Each output row only depends
+    on its input row, so chunks of the dataset can be cleaned independently and concatenated
+    in order. With a cache_dir, stages whose inputs and code are unchanged are not rerun"""
+    df = df.copy()
+    for stage in CLEANING_STAGES:
+        outputs = run_stage(stage, df, cache_dir)
+        for col in outputs.columns:
+            df[col] = outputs[col]
+    return df
+
+def merge_extracted_fields(df, keep_catalog_numbers=None, fill_language=None, fill_page_count=None):
+    """Decide over the whole dataset where extracted values replace or fill existing fields.
+    The decisions are taken from df itself unless they are given, e.g. for a chunk of the dataset"""
+    if keep_catalog_numbers is None:
+        keep_catalog_numbers = (df['catalog_number_1'].astype(str) != "").any()
+    if fill_language is None:
+        fill_language = 'language' in df.columns and df['language'].isna().sum() > 0
+    if fill_page_count is None:
+        fill_page_count = 'page_count' in df.columns and df['page_count'].isna().sum() > 0
+    
+    # Only keep catalog numbers columns if they provide new information
+    if not keep_catalog_numbers:
+        # Skip creating redundant catalog number columns
+        logger.info("Skipping catalog number extraction as they match text_id")
+        df = df.drop(columns=['catalog_number_1', 'catalog_number_2'])
     
     # Use extracted publisher/location if existing fields are empty
     if 'publisher' not in df.columns:
         df['publisher'] = df['publisher_extracted']
     else:
-        df['publisher'] = df.apply(
-            lambda row: row['publisher'] if pd.notna(row['publisher']) and row['publisher'] else row['publisher_extracted'],
-            axis=1
-        )
+        df['publisher'] = _fill_missing(df['publisher'], df['publisher_extracted'])
         
     if 'location' not in df.columns:
         df['location'] = df['location_extracted']
     else:
-        df['location'] = df.apply(
-            lambda row: row['location'] if pd.notna(row['location']) and row['location'] else row['location_extracted'],
-            axis=1
-        )
+        df['location'] = _fill_missing(df['location'], df['location_extracted'])
     
-    # Extract language information
-    logger.info("Extracting language information")
+    # Fill in missing language values where possible
     if 'language' not in df.columns:
-        df['language'] = df['categories_list'].apply(extract_language_from_categories)
-    elif df['language'].isna().sum() > 0:
-        # Fill in missing language values where possible
-        extracted_languages = df['categories_list'].apply(extract_language_from_categories)
-        df['language'] = df.apply(
-            lambda row: row['language'] if pd.notna(row['language']) and row['language'] else extracted_languages.loc[row.name],
-            axis=1
-        )
+        df['language'] = df['language_extracted']
+    elif fill_language:
+        df['language'] = _fill_missing(df['language'], df['language_extracted'])
     
-    # Extract page count
-    logger.info("Extracting page count")
+    # Fill in missing page count values where possible
     if 'page_count' not in df.columns:
-        df['page_count'] = df['content'].apply(extract_page_count)
-    elif df['page_count'].isna().sum() > 0:
-        # Fill in missing page count values where possible
-        extracted_page_counts = df['content'].apply(extract_page_count)
-        df['page_count'] = df.apply(
-            lambda row: row['page_count'] if pd.notna(row['page_count']) else extracted_page_counts.loc[row.name],
-            axis=1
-        )
-    
-    # 6. Extract content items
-    logger.info("Step 6: Extracting content items")
+        df['page_count'] = df['page_count_extracted']
+    elif fill_page_count:
+        df['page_count'] = df['page_count'].where(df['page_count'].notna(), df['page_count_extracted'])
     
-    # Extract content items, original titles, translators, and page ranges
-    content_items_data = df.apply(
-        lambda row: pd.Series(extract_content_items(row.get('content', ''))), 
-        axis=1
-    )
-    
-    # If there are content items extracted, add them to the dataframe
-    if not content_items_data.empty and len(content_items_data.columns) > 0:
-        # Add all content item columns to the main dataframe
-        for col in content_items_data.columns:
-            df[col] = content_items_data[col]
-    
-    # Now extract titles with access to content items data
-    logger.info("Extracting transliterated and original titles")
-    titles_extracted = df.apply(
-        lambda row: pd.Series(extract_transliterated_title_and_original(row.get('content', ''))),
-        axis=1
-    )
+    return df
 
-    # 7. Create fully cleaned content and titles
-    logger.info("Step 7: Creating fully cleaned content")
+def _init_worker(cache_dir, rule_stats=False):
+    """Set up a worker process for clean_rows_parallel"""
+    # The parent process reports progress, workers only report problems
+    logger.setLevel(logging.WARNING)
+    if rule_stats:
+        enable_rule_stats()
+    
+    # Forked workers inherit the counters of the parent, which has counted them already
+    ENCODING_RULE_STATS.export()
+    for cache in ENCODING_CACHES:
+        cache.export()
+        cache.exporting = True
+        if cache_dir and not cache.entries:
+            cache.load(cache_dir)
+
+def _clean_chunk(chunk, cache_dir=None):
+    """Clean one chunk in a worker and hand the new encoding repairs back to the parent"""
+    return clean_rows(chunk, cache_dir), [cache.export() for cache in ENCODING_CACHES], ENCODING_RULE_STATS.export()
+
+def worker_pool(workers, cache_dir=None):
+    """Pool of worker processes for clean_rows_parallel, to be used as a context manager"""
+    return multiprocessing.Pool(workers, initializer=_init_worker, initargs=(cache_dir, ENCODING_RULE_STATS.enabled))
+
+def clean_rows_parallel(df, workers, cache_dir=None, pool=None):
+    """Run clean_rows over row chunks in a pool of worker processes, keeping the row order.
+    Without a pool, one is started for this call and shut down afterwards"""
+    if pool is None:
+        with worker_pool(workers, cache_dir) as pool:
+            return clean_rows_parallel(df, workers, cache_dir, pool)
+    
+    chunk_size = max(1, math.ceil(len(df) / (workers * 4)))
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    logger.info(f"Cleaning {len(df)} rows in {len(chunks)} chunks with {workers} worker processes")
+    results = pool.starmap(_clean_chunk, [(chunk, cache_dir) for chunk in chunks])
+    
+    for _, exported_caches, exported_stats in results:
+        for cache, exported in zip(ENCODING_CACHES, exported_caches):
+            cache.merge(exported)
+        ENCODING_RULE_STATS.merge(exported_stats)
+    logger.info(f"Encoding cache after row-local steps: {ENCODING_CACHE.stats()}")
+    
+    return pd.concat([cleaned for cleaned, _, _ in results])
+
+def _clean_rows_any(df, workers=1, cache_dir=None, pool=None):
+    """Run clean_rows, spread over worker processes if asked to"""
+    if workers > 1 and len(df) > 1:
+        return clean_rows_parallel(df, workers, cache_dir, pool)
+    return clean_rows(df, cache_dir)
+
+def _row_hashes(df):
+    """Hash all input values of each row, so any change to a row gives it a new hash"""
+    return pd.util.hash_pandas_object(df.map(repr), index=False).values
+
+def load_manifest(manifest_file):
+    """Load the rows cleaned by an earlier run, if they were cleaned by the current code"""
+    if not os.path.exists(manifest_file):
+        logger.info(f"No manifest found at {manifest_file}, cleaning all rows")
+        return None
     
-    # Create a clean title field with priority to transliterated titles for bilingual works
-    logger.info("Creating clean title field")
-    if 'transliterated_title' in df.columns:
-        # Use transliterated title as primary when available
-        df['title'] = df.apply(
-            lambda row: row['transliterated_title'] if row['transliterated_title'] else 
-                       (extract_title(row) if 'transliterated_title' not in row or not row['transliterated_title'] else ""),
-            axis=1
-        )
+    manifest = pd.read_pickle(manifest_file)
+    if manifest['version'] != CLEANING_VERSION:
+        logger.info(f"Manifest {manifest_file} was written by other cleaning code, cleaning all rows")
+        return None
+    return manifest['rows']
+
+def save_manifest(manifest_file, rows):
+    """Store the cleaned rows together with the version of the code that cleaned them"""
+    manifest_dir = os.path.dirname(manifest_file)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    partial_file = manifest_file + '.partial'
+    pd.to_pickle({'version': CLEANING_VERSION, 'rows': rows}, partial_file)
+    os.replace(partial_file, manifest_file)
+    logger.info(f"Saved {len(rows)} cleaned rows to manifest {manifest_file}")
+
+def clean_rows_incremental(df, manifest_file, workers=1, cache_dir=None):
+    """Run clean_rows only on rows that are new or changed since the run that wrote the
+    manifest, reusing the cleaned rows of the others. Rows are matched on page_id, text_id
+    and a hash of all their input values. The manifest is rewritten with the current rows,
+    so deleted rows are dropped from it"""
+    key_columns = [col for col in ['page_id', 'text_id'] if col in df.columns] + ['row_hash']
+    keys = pd.MultiIndex.from_frame(df[key_columns[:-1]].assign(row_hash=_row_hashes(df)))
+    
+    previous = load_manifest(manifest_file)
+    if previous is not None:
+        previous = previous.drop_duplicates(subset=key_columns).set_index(key_columns, drop=False).drop(columns='row_hash')
+        reused_mask = keys.isin(previous.index)
     else:
-        df['title'] = df.apply(extract_title, axis=1)
-    
-    # Clean content - completely remove wiki markup
-    logger.info("Completely removing wiki markup from content")
-    df['clean_content'] = df['content_cleaned'].apply(remove_wiki_markup)
-    
-    # Fix any remaining encoding issues in the clean content
-    df['clean_content'] = df['clean_content'].apply(fix_encoding_deep)
-    
-    # 8. Prepare final dataset for manual editing
-    logger.info("Step 8: Preparing final dataset for manual editing")
-    
+        reused_mask = keys.isin([])
+    
+    changed = df[~reused_mask]
+    logger.info(f"Incremental cleaning: reusing {reused_mask.sum()} rows, cleaning {len(changed)} new or changed rows")
+    if previous is not None:
+        logger.info(f"Dropping {len(previous) - len(keys[reused_mask].unique())} previous rows that were deleted or changed")
+    
+    parts = []
+    if reused_mask.any():
+        reused = previous.loc[keys[reused_mask]]
+        reused.index = df.index[reused_mask]
+        parts.append(reused)
+    if len(changed):
+        parts.append(_clean_rows_any(changed, workers, cache_dir))
+    cleaned = pd.concat(parts).loc[df.index] if parts else clean_rows(df, cache_dir)
+    
+    save_manifest(manifest_file, cleaned.assign(row_hash=keys.get_level_values('row_hash')))
+    return cleaned
+
+# Columns of the content items table written next to the final dataset, one row per item
+CONTENT_ITEMS_TABLE_COLUMNS = ['entry_id', 'position'] + CONTENT_ITEM_FIELDS
+
+# Columns of the dates table written next to the final dataset, one row per date
+DATES_TABLE_COLUMNS = ['entry_id', 'position'] + DATE_FIELDS
+
+# Columns checked for remaining mojibake in Step 9
+VERIFIED_COLUMNS = ['title', 'original_title', 'clean_content']
+
+# Mojibake signatures that should not survive the encoding repair, one bit each, by name
+# and pattern. Ã, Ä and Å only count as the lead of a mis-decoded two-byte sequence, as in
+# MOJIBAKE_SEQUENCE, so that German and Swedish text ("Ältere", "Ångest") is no mojibake.
+# Longer signatures come first so that they win over their prefixes in the scan
+ENCODING_SIGNATURES = {
+    'viá¸': re.escape('viá¸'),
+    'á¸': re.escape('á¸'),
+    'á¹': re.escape('á¹'),
+    'Ã': 'Ã' + MOJIBAKE_CONTINUATION,
+    'Ä': 'Ä' + MOJIBAKE_CONTINUATION,
+    'Å': 'Å' + MOJIBAKE_CONTINUATION,
+    'ā\xad': re.escape('ā\xad'),
+}
+ENCODING_SIGNATURE_BITS = {signature: 1 << i for i, signature in enumerate(ENCODING_SIGNATURES)}
+ENCODING_SIGNATURE_PATTERN = '|'.join(f'({pattern})' for pattern in ENCODING_SIGNATURES.values())
+
+def _signature_mask(found):
+    # findall gives one group per signature for each match, only the matching one is set
+    mask = 0
+    for groups in set(found):
+        for group, bit in zip(groups, ENCODING_SIGNATURE_BITS.values()):
+            if group:
+                mask |= bit
+    return mask
+
+def scan_encoding_signatures(series):
+    """Scan a column once for all mojibake signatures.
+    Returns a bitmask per row, 0 for rows without any signature"""
+    found = series.astype(str).str.findall(ENCODING_SIGNATURE_PATTERN)
+    hits = found[found.str.len() > 0]
+    return hits.map(_signature_mask).reindex(series.index, fill_value=0).astype(int)
+
+def count_encoding_signatures(mask):
+    """Number of rows per signature in a bitmask from scan_encoding_signatures"""
+    return {
+        signature: int((mask & bit).astype(bool).sum())
+        for signature, bit in ENCODING_SIGNATURE_BITS.items()
+        if (mask & bit).any()
+    }
+
+def prepare_final_dataset(df, catalog_columns=None):
+    """Select and order the columns for manual editing and standardise empty values.
+    The catalog number columns are taken from df unless given"""
     # Define comprehensive columns structure for the final dataset
     # Base columns from the existing script
     base_columns = [
@@ -899,6 +1655,7 @@ def clean_zweig_bibliography(input_file, output_file):
         'text_id',
         'title',
         'original_title',
+        'title_source',
         'full_bibliographic_entry',
         'year',
         'publisher',
@@ -908,25 +1665,17 @@ def clean_zweig_bibliography(input_file, output_file):
     ]
     
     # Add catalog_number columns only if they were created and have different values from text_id
-    if 'catalog_number_1' in df.columns and df['catalog_number_1'].astype(str).ne("").any():
-        base_columns.insert(2, 'catalog_number_1')
-        if 'catalog_number_2' in df.columns and df['catalog_number_2'].astype(str).ne("").any():
-            base_columns.insert(3, 'catalog_number_2')
+    if catalog_columns is None:
+        catalog_columns = []
+        if 'catalog_number_1' in df.columns and df['catalog_number_1'].astype(str).ne("").any():
+            catalog_columns.append('catalog_number_1')
+            if 'catalog_number_2' in df.columns and df['catalog_number_2'].astype(str).ne("").any():
+                catalog_columns.append('catalog_number_2')
+    base_columns[2:2] = catalog_columns
     
     # Add clean_content column
     base_columns.append('clean_content')
     
-    # Add content item columns (up to 3 items)
-    content_item_columns = []
-    for i in range(1, 4):
-        item_cols = [
-            f'content_item_{i}_title',
-            f'content_item_{i}_original_title',
-            f'content_item_{i}_translator',
-            f'content_item_{i}_pages',
-        ]
-        content_item_columns.extend([col for col in item_cols if col in df.columns])
-    
     # Add category and metadata columns
     category_columns = [
         'categories',
@@ -935,13 +1684,13 @@ def clean_zweig_bibliography(input_file, output_file):
     ]
     
     # Combine all columns
-    all_columns = base_columns + content_item_columns + category_columns
+    all_columns = base_columns + category_columns
     
     # Check which columns are actually available
     available_columns = [col for col in all_columns if col in df.columns]
     
     # Create the final dataframe
-    final_df = df[available_columns].copy()
+    final_df = df.reindex(columns=available_columns)
     
     # Replace NaN values with empty strings for cleaner spreadsheet viewing
     for col in final_df.columns:
@@ -951,91 +1700,1076 @@ def clean_zweig_bibliography(input_file, output_file):
             # Convert numeric NaN to empty string
             final_df[col] = final_df[col].apply(lambda x: "" if pd.isna(x) else x)
     
-    log_dataframe_info(final_df, "Final dataset for manual editing")
-    
-    # 9. Verify encoding quality
-    logger.info("Step 9: Verifying encoding quality")
-    
-    # Check for remaining problematic encoding patterns
-    problematic_patterns = [
-        'Ã', 'Ä', 'Å', 'á¸', 'á¹', 'č', 'viá¸', 'Bhč', 'Mč', 'ā­'
+    return categorise_columns(final_df)
+
+def build_content_items_table(df):
+    """One row per content item of each entry, indexed by entry_id (the page_id of the entry)
+    and numbered by position within the entry"""
+    entry_ids = df['page_id'] if 'page_id' in df.columns else pd.Series(df.index, index=df.index)
+    rows = [
+        (entry_id, position) + item
+        for entry_id, items in zip(entry_ids, df['content_items'])
+        for position, item in enumerate(items, 1)
+    ]
+    return pd.DataFrame(rows, columns=CONTENT_ITEMS_TABLE_COLUMNS).set_index('entry_id')
+
+def build_dates_table(df):
+    """One row per date of each entry, indexed by entry_id (the page_id of the entry)
+    and numbered by position within the entry"""
+    entry_ids = df['page_id'] if 'page_id' in df.columns else pd.Series(df.index, index=df.index)
+    rows = [
+        (entry_id, position) + date
+        for entry_id, dates in zip(entry_ids, df['dates'])
+        for position, date in enumerate(dates, 1)
+    ]
+    dates = pd.DataFrame(rows, columns=DATES_TABLE_COLUMNS).set_index('entry_id')
+    return dates.astype({'end_year': 'Int64', 'month': 'Int64'})
+
+def companion_file_for(output_file, name):
+    """Path of a table written next to output_file, e.g. <output>_content_items.csv"""
+    root, ext = os.path.splitext(output_file)
+    return f"{root}_{name}{ext or '.csv'}"
+
+def read_content_items(path):
+    """Read a content items table, indexed by entry_id for lookups per entry"""
+    items = pd.read_csv(path, dtype=object, keep_default_na=False, index_col='entry_id')
+    items['position'] = items['position'].astype(int)
+    return items.sort_index(kind='stable')
+
+class UnionFind:
+    """Disjoint sets over the integers 0..n-1 with path halving and union by size"""
+    
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+    
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    def union(self, x, y):
+        """Merge the sets of x and y, returns the root of the merged set"""
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return x
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+        return x
+
+# LSH over the MinHash signatures: rows that agree on all values of at least one band
+# are candidates, and are clustered if their estimated similarity reaches the threshold.
+# 16 bands of 8 rows put the LSH threshold at about (1/16) ** (1/8) = 0.71
+LSH_BANDS = 16
+LSH_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+def find_near_duplicate_clusters(signatures):
+    """Cluster rows with near-identical MinHash signatures (None for rows without text).
+    Candidates are the rows that share an LSH bucket; each is compared with the first row
+    of its bucket only, so the work grows linearly with the rows.
+    Returns a cluster id per row (1, 2, ... in order of first row, NA for rows without a
+    near duplicate) and the estimated similarity of each row to the first row of its cluster"""
+    n = len(signatures)
+    clusters = pd.array([pd.NA] * n, dtype='Int64')
+    similarity = np.full(n, np.nan)
+    rows = np.array([i for i, signature in enumerate(signatures) if signature is not None], dtype=np.intp)
+    if len(rows) < 2:
+        return clusters, similarity
+    matrix = np.vstack([signatures[i] for i in rows])
+    
+    sets = UnionFind(len(rows))
+    for band in range(LSH_BANDS):
+        values = np.ascontiguousarray(matrix[:, band * LSH_ROWS_PER_BAND:(band + 1) * LSH_ROWS_PER_BAND])
+        keys = values.view(np.dtype((np.void, values.dtype.itemsize * LSH_ROWS_PER_BAND))).ravel()
+        _, first, bucket = np.unique(keys, return_index=True, return_inverse=True)
+        leader = first[bucket]
+        candidates = np.nonzero(leader != np.arange(len(rows)))[0]
+        if not len(candidates):
+            continue
+        agreement = (matrix[candidates] == matrix[leader[candidates]]).mean(axis=1)
+        for row, other in zip(candidates[agreement >= NEAR_DUPLICATE_THRESHOLD], leader[candidates[agreement >= NEAR_DUPLICATE_THRESHOLD]]):
+            sets.union(row, other)
+    
+    roots = np.array([sets.find(i) for i in range(len(rows))])
+    sizes = np.bincount(roots, minlength=len(rows))
+    next_id = 1
+    cluster_ids = {}
+    first_rows = {}
+    for i, root in enumerate(roots):
+        if sizes[root] < 2:
+            continue
+        if root not in cluster_ids:
+            cluster_ids[root] = next_id
+            first_rows[root] = i
+            next_id += 1
+        clusters[rows[i]] = cluster_ids[root]
+        similarity[rows[i]] = (matrix[i] == matrix[first_rows[root]]).mean()
+    return clusters, similarity
+
+def near_duplicate_report(final_df, clusters, similarity):
+    """One row per entry that has near duplicates, ordered by cluster"""
+    members = pd.notna(clusters)
+    columns = [col for col in ['page_id', 'text_id', 'title', 'year'] if col in final_df.columns]
+    report = final_df.loc[members, columns].copy()
+    report.insert(0, 'duplicate_cluster', clusters[members])
+    report['similarity'] = similarity[members].round(3)
+    return report.sort_values('duplicate_cluster', kind='stable')
+
+def log_near_duplicates(report, examples=5):
+    """Summarise the near-duplicate clusters"""
+    if report.empty:
+        logger.info("No near-duplicate entries found")
+        return
+    sizes = report['duplicate_cluster'].value_counts()
+    logger.info(f"Found {len(sizes)} clusters of near-duplicate entries covering {len(report)} entries "
+                f"(largest has {sizes.max()} entries)")
+    for cluster in sizes.index[:examples]:
+        titles = report.loc[report['duplicate_cluster'] == cluster, 'title'].astype(str).head(3).tolist()
+        logger.info(f"  Cluster {cluster} ({sizes[cluster]} entries): {titles}")
+
+def _title_key(title):
+    """Key under which a page title or redirect target is looked up: without section anchor,
+    underscores as spaces, whitespace collapsed and, as in MediaWiki, the first letter capitalised"""
+    if not isinstance(title, str):
+        return None
+    key = ' '.join(title.split('#')[0].replace('_', ' ').split())
+    return key[:1].upper() + key[1:] if key else None
+
+def resolve_redirects(page_ids, redirects, titles, page_titles=None):
+    """Map every entry to the page_id of the page it ends up on when redirects are followed.
+    Titles are looked up in a hash index of the page titles (page_titles if the input has them,
+    otherwise the cleaned titles of the entries that are no redirects). Each redirect joins the
+    set of its target with union-find, so chains collapse onto the one page that is no redirect.
+    Returns the canonical page_id per row (NA for redirects that end in a cycle or at a missing
+    page) and the counts for the report"""
+    page_ids = list(page_ids)
+    redirects = [redirect if isinstance(redirect, str) and redirect else None for redirect in redirects]
+    n = len(page_ids)
+    
+    # Hash index from title to row; the first page with a title wins
+    index = {}
+    ambiguous = 0
+    keyed_titles = page_titles if page_titles is not None and pd.notna(page_titles).any() else titles
+    for i, title in enumerate(keyed_titles):
+        if keyed_titles is titles and redirects[i] is not None:
+            continue
+        key = _title_key(title)
+        if key is None:
+            continue
+        if key in index:
+            ambiguous += 1
+        else:
+            index[key] = i
+    
+    sets = UnionFind(n)
+    cycle_rows = []
+    chained = 0
+    for i, redirect in enumerate(redirects):
+        if redirect is None:
+            continue
+        target = index.get(_title_key(redirect))
+        if target is None:
+            continue
+        if redirects[target] is not None:
+            chained += 1
+        if sets.find(i) == sets.find(target):
+            # Each page redirects to at most one other, so a closed set is a cycle
+            cycle_rows.append(i)
+        else:
+            sets.union(i, target)
+    
+    # Each set has at most one page that is no redirect, its canonical page
+    canonical_of_root = {sets.find(i): page_ids[i] for i in range(n) if redirects[i] is None}
+    canonical = pd.array([canonical_of_root.get(sets.find(i), pd.NA) for i in range(n)], dtype='Int64')
+    cycle_roots = {sets.find(i) for i in cycle_rows}
+    in_cycles = sum(1 for i in range(n) if sets.find(i) in cycle_roots)
+    redirect_count = sum(redirect is not None for redirect in redirects)
+    unresolved = sum(1 for i in range(n) if redirects[i] is not None and pd.isna(canonical[i])) - in_cycles
+    stats = {
+        'redirects': redirect_count,
+        'resolved': redirect_count - unresolved - in_cycles,
+        'chained': chained,
+        'unresolved': unresolved,
+        'in_cycles': in_cycles,
+        'ambiguous_titles': ambiguous,
+    }
+    return canonical, stats
+
+def log_redirect_resolution(stats):
+    """Summarise the result of resolve_redirects"""
+    logger.info(f"Resolved {stats['resolved']} of {stats['redirects']} redirects to a canonical page "
+                f"({stats['chained']} redirect to another redirect)")
+    if stats['unresolved']:
+        logger.info(f"{stats['unresolved']} redirects lead to a page that is not in the dataset")
+    if stats['in_cycles']:
+        logger.warning(f"{stats['in_cycles']} redirects are part of redirect cycles")
+    if stats['ambiguous_titles']:
+        logger.info(f"{stats['ambiguous_titles']} pages share their title with an earlier page and are not redirect targets")
+
+# Letters that do not decompose into a base letter and combining marks, and the
+# transliteration marks for ayn and hamza that carry no letter of their own
+FOLD_TABLE = str.maketrans({
+    'ł': 'l', 'ø': 'o', 'đ': 'd', 'ħ': 'h', 'ı': 'i', 'æ': 'ae', 'œ': 'oe', 'þ': 'th', 'ð': 'd',
+    'ʿ': None, 'ʾ': None, 'ʻ': None, 'ʼ': None, 'ʹ': None, 'ʺ': None,
+})
+
+COMBINING_MARKS = re.compile('[' + ''.join(
+    re.escape(chr(code)) for code in range(0x110000) if unicodedata.combining(chr(code))
+) + ']')
+
+@lru_cache(maxsize=WIKI_PARSE_CACHE_SIZE)
+def fold_text(text):
+    """Text for accent- and case-insensitive matching: diacritics removed and case folded"""
+    if not isinstance(text, str):
+        return ""
+    return COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', text.casefold())).translate(FOLD_TABLE)
+
+def fold_column(values):
+    """fold_text for a whole column, with whitespace collapsed"""
+    return (
+        pd.Series(values, dtype=object).fillna("")
+        .str.casefold()
+        .str.normalize('NFKD')
+        .str.replace(COMBINING_MARKS, '', regex=True)
+        .str.translate(FOLD_TABLE)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+    )
+
+# Leading articles dropped from sort keys, matched on folded titles
+LEADING_ARTICLE_PATTERN = (
+    r"^(?:(?:the|an?|der|die|das|eine?|les?|la|une?|el|los|las|il|lo|gli|uno|una|het|een)\s+|l')"
+)
+
+def add_title_keys(final_df, sortkeys):
+    """Add title_fold and title_sortkey after the title column. title_fold is the folded title
+    for accent-insensitive search; title_sortkey is the folded DEFAULTSORTKEY of the entry or,
+    without one, the folded title without leading punctuation and articles"""
+    title_fold = fold_column(final_df['title'])
+    sortkeys = pd.Series(list(sortkeys), index=final_df.index, dtype=object)
+    has_sortkey = sortkeys.fillna("").astype(str).str.strip() != ""
+    title_sortkey = (
+        title_fold
+        .str.replace(r'^\W+', '', regex=True)
+        .str.replace(LEADING_ARTICLE_PATTERN, '', regex=True)
+    )
+    title_sortkey = title_sortkey.where(~has_sortkey, fold_column(sortkeys))
+    position = final_df.columns.get_loc('title') + 1
+    final_df.insert(position, 'title_fold', title_fold.values)
+    final_df.insert(position + 1, 'title_sortkey', title_sortkey.values)
+    return final_df
+
+def title_tokens(title):
+    """Folded word tokens of a title, for blocking and scoring title matches"""
+    return frozenset(token for token in re.findall(r'\w+', fold_text(title)) if len(token) > 1 or token.isdigit())
+
+# Record linkage from translations to the entries of their originals. Original titles are
+# only scored against works that share one of their LINKAGE_BLOCKING_KEYS rarest tokens;
+# tokens found in more than LINKAGE_MAX_BLOCK work titles are too common to block on
+LINKAGE_BLOCKING_KEYS = 3
+LINKAGE_MAX_BLOCK = 200
+LINKAGE_THRESHOLD = 0.7
+WORK_LINK_COLUMNS = ['page_id', 'position', 'original_title', 'work_page_id', 'work_title', 'score']
+
+def link_translations(entries, content_items=None):
+    """Link the original titles of entries and content items to the entries of the works.
+    entries needs page_id, title, original_title and canonical_page_id; works are the entries
+    that are no redirects and have no original title themselves. Candidates come from a
+    blocking index on folded title tokens and are scored by the Jaccard similarity of the
+    tokens. Returns one row per link, position is empty for links of whole entries"""
+    is_work = (entries['canonical_page_id'] == entries['page_id']).fillna(False) & \
+        (entries['original_title'].fillna("") == "") & (entries['title'].fillna("") != "")
+    works = entries.loc[is_work, ['page_id', 'title']].reset_index(drop=True)
+    work_tokens = [title_tokens(title) for title in works['title']]
+    
+    # Blocking index from token to works
+    index = {}
+    for i, tokens in enumerate(work_tokens):
+        for token in tokens:
+            index.setdefault(token, []).append(i)
+    index = {token: rows for token, rows in index.items() if len(rows) <= LINKAGE_MAX_BLOCK}
+    
+    sources = [
+        (page_id, "", original_title)
+        for page_id, original_title in zip(entries['page_id'], entries['original_title'])
+        if isinstance(original_title, str) and original_title
     ]
+    if content_items is not None:
+        sources += [
+            (entry_id, position, original_title)
+            for entry_id, position, original_title in zip(content_items.index, content_items['position'], content_items['original_title'])
+            if isinstance(original_title, str) and original_title
+        ]
     
+    links = []
+    for page_id, position, original_title in sources:
+        tokens = title_tokens(original_title)
+        keys = sorted((token for token in tokens if token in index), key=lambda token: len(index[token]))
+        candidates = set()
+        for token in keys[:LINKAGE_BLOCKING_KEYS]:
+            candidates.update(index[token])
+        best, best_score = None, LINKAGE_THRESHOLD
+        for i in sorted(candidates):
+            if works.at[i, 'page_id'] == page_id:
+                continue
+            score = len(tokens & work_tokens[i]) / len(tokens | work_tokens[i])
+            if score >= best_score and (best is None or score > best_score):
+                best, best_score = i, score
+        if best is not None:
+            links.append((page_id, position, original_title, works.at[best, 'page_id'], works.at[best, 'title'], round(best_score, 3)))
+    
+    logger.info(f"Linked {len(links)} of {len(sources)} original titles to the entries of their works "
+                f"({len(works)} candidate works, {len(index)} blocking keys)")
+    return pd.DataFrame(links, columns=WORK_LINK_COLUMNS)
+
+# Authority normalisation of publishers and places. Keys are folded, punctuation-free and,
+# for places, mapped from exonyms to one spelling; for publishers the generic words that
+# publishers add to or drop from their names are left out. Keys with at least
+# AUTHORITY_THRESHOLD trigram similarity to an earlier key share its authority
+AUTHORITY_THRESHOLD = 0.75
+AUTHORITY_MIN_FUZZY_LENGTH = 5
+PLACE_ALIASES = {
+    'vienna': 'wien', 'vienne': 'wien', 'viena': 'wien',
+    'moscow': 'moskva', 'moscou': 'moskva', 'moskau': 'moskva',
+    'munich': 'munchen', 'cologne': 'koln', 'prague': 'praha', 'prag': 'praha',
+    'warsaw': 'warszawa', 'warschau': 'warszawa', 'rome': 'roma', 'rom': 'roma',
+    'lisbon': 'lisboa', 'lissabon': 'lisboa', 'geneva': 'geneve', 'genf': 'geneve',
+    'st petersburg': 'sankt peterburg', 'leningrad': 'sankt peterburg',
+    'new york city': 'new york', 'frankfurt am main': 'frankfurt', 'frankfurt a m': 'frankfurt',
+}
+PUBLISHER_STOPWORDS = {
+    'izdatel', 'stvo', 'izdatelstvo', 'verlag', 'verlagsanstalt', 'publishing', 'publishers', 'publisher',
+    'editions', 'edition', 'editorial', 'editore', 'edizioni', 'editora', 'press', 'books',
+    'ltd', 'inc', 'gmbh', 'co', 'and', 'und', 'et',
+}
+
+class AuthorityIndex:
+    """Authority file for one kind of free-text value (publisher, location). Each distinct
+    string gets the id of an authority; new keys are compared with the keys seen so far
+    through a character-trigram inverted index and join the most similar one above the
+    threshold, or start a new authority labelled with the string. Strings are resolved in
+    order of first appearance, so ids only depend on the order of the rows"""
+    
+    def __init__(self, kind, aliases=None, stopwords=frozenset(), threshold=AUTHORITY_THRESHOLD):
+        self.kind = kind
+        self.aliases = aliases or {}
+        self.stopwords = stopwords
+        self.threshold = threshold
+        self.version = _code_version(AuthorityIndex.key, AuthorityIndex._match, fold_text, FOLD_TABLE, self.aliases, sorted(self.stopwords), threshold)
+        self.labels = []
+        self.keys = []
+        self.key_trigrams = []
+        self.postings = {}
+        self.key_ids = {}
+        self.variants = {}
+        self.resolved = 0
+    
+    def key(self, text):
+        words = re.findall(r'\w+', fold_text(text))
+        significant = [word for word in words if word not in self.stopwords] or words
+        key = ' '.join(significant)
+        return self.aliases.get(key, key)
+    
+    @staticmethod
+    def trigrams(key):
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def _add(self, label, key):
+        authority_id = len(self.labels) + 1
+        trigrams = self.trigrams(key)
+        self.labels.append(label)
+        self.keys.append(key)
+        self.key_trigrams.append(trigrams)
+        self.key_ids[key] = authority_id
+        for trigram in trigrams:
+            self.postings.setdefault(trigram, []).append(authority_id)
+        return authority_id
+    
+    def _match(self, key):
+        """Id of the most similar earlier key above the threshold, None if there is none"""
+        if key in self.key_ids:
+            return self.key_ids[key]
+        if len(key) < AUTHORITY_MIN_FUZZY_LENGTH:
+            return None
+        trigrams = self.trigrams(key)
+        # A key with a Jaccard similarity of at least the threshold shares one of any
+        # len - ceil(threshold * len) + 1 trigrams; take the ones with the shortest postings
+        prefix = len(trigrams) - math.ceil(self.threshold * len(trigrams)) + 1
+        rarest = sorted(trigrams, key=lambda trigram: len(self.postings.get(trigram, ())))[:prefix]
+        candidates = set()
+        for trigram in rarest:
+            candidates.update(self.postings.get(trigram, ()))
+        best, best_score = None, self.threshold
+        for authority_id in sorted(candidates):
+            other = self.key_trigrams[authority_id - 1]
+            shared = len(trigrams & other)
+            score = shared / (len(trigrams) + len(other) - shared)
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = authority_id, score
+        return best
+    
+    def resolve(self, text):
+        """Authority id of a string, None for empty values"""
+        if not isinstance(text, str) or not text.strip():
+            return None
+        if text in self.variants:
+            return self.variants[text]
+        key = self.key(text)
+        if not key:
+            return None
+        self.resolved += 1
+        authority_id = self._match(key)
+        if authority_id is None:
+            authority_id = self._add(text.strip(), key)
+        else:
+            self.key_ids.setdefault(key, authority_id)
+        self.variants[text] = authority_id
+        return authority_id
+    
+    def resolve_column(self, values):
+        """Authority ids for a whole column, each distinct string is resolved once"""
+        values = pd.Series(values).astype(object)
+        ids = {value: self.resolve(value) for value in pd.unique(values)}
+        return pd.array([ids[value] for value in values], dtype='Int64')
+    
+    def path(self, cache_dir):
+        return os.path.join(cache_dir, f"authority_{self.kind}_{self.version}.json")
+    
+    def load(self, cache_dir):
+        """Load the authorities and resolved strings of earlier runs with the same rules"""
+        path = self.path(cache_dir)
+        if not os.path.exists(path):
+            logger.info(f"No {self.kind} authority file found at {path}")
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable authority file {path}: {str(e)}")
+            return
+        for label, key in zip(saved['labels'], saved['keys']):
+            self._add(label, key)
+        self.variants.update(saved['variants'])
+        logger.info(f"Loaded {len(self.labels)} {self.kind} authorities with {len(self.variants)} variants from {path}")
+    
+    def save(self, cache_dir):
+        """Save the authorities so the next run only resolves strings it has not seen"""
+        os.makedirs(cache_dir, exist_ok=True)
+        path = self.path(cache_dir)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'labels': self.labels, 'keys': self.keys, 'variants': self.variants}, f, ensure_ascii=False)
+        logger.info(f"Saved {len(self.labels)} {self.kind} authorities to {path}")
+    
+    def table(self):
+        """One row per resolved string with the id and label of its authority"""
+        return pd.DataFrame(
+            [(self.kind, authority_id, self.labels[authority_id - 1], variant) for variant, authority_id in self.variants.items()],
+            columns=['kind', 'authority_id', 'label', 'variant'],
+        )
+
+PUBLISHER_AUTHORITY = AuthorityIndex('publisher', stopwords=PUBLISHER_STOPWORDS)
+LOCATION_AUTHORITY = AuthorityIndex('location', aliases=PLACE_ALIASES)
+AUTHORITIES = {'publisher': PUBLISHER_AUTHORITY, 'location': LOCATION_AUTHORITY}
+
+def add_authority_ids(final_df):
+    """Add publisher_id and location_id after the publisher and location columns"""
+    for col, authority in AUTHORITIES.items():
+        if col in final_df.columns:
+            final_df.insert(final_df.columns.get_loc(col) + 1, f"{col}_id", authority.resolve_column(final_df[col]))
+    return final_df
+
+def log_authorities():
+    for authority in AUTHORITIES.values():
+        logger.info(f"{authority.kind.capitalize()} authority: {len(authority.variants)} distinct strings "
+                    f"in {len(authority.labels)} authorities, {authority.resolved} resolved in this run")
+
+def verify_encoding(final_df):
+    """Count the rows with remaining mojibake per column and give them another deep repair.
+    Each column is scanned once; the signature mask selects the examples and the rows to repair.
+    Returns the counts, up to three examples per column, the remaining count for titles
+    and the number of rows per signature and column"""
     encoding_issues = {}
-    for col in ['title', 'original_title', 'clean_content']:
+    examples = {}
+    signature_counts = {}
+    remaining_issues = 0
+    for col in VERIFIED_COLUMNS:
         if col in final_df.columns:
-            pattern_count = sum(final_df[col].astype(str).str.contains('|'.join(problematic_patterns), regex=True))
+            mask = scan_encoding_signatures(final_df[col])
+            hits = mask != 0
+            pattern_count = int(hits.sum())
             if pattern_count > 0:
                 encoding_issues[col] = pattern_count
+                signature_counts[col] = count_encoding_signatures(mask)
+                examples[col] = final_df.loc[hits, col].head(3).tolist()
+                
+                # Additional deep cleaning pass for problematic entries
+                final_df.loc[hits, col] = final_df.loc[hits, col].apply(lambda x: REPAIRED_ENCODING_CACHE(REPAIRED_ENCODING_CACHE(x)))
                 
-                # Log examples of problematic entries
-                problematic_entries = final_df[final_df[col].astype(str).str.contains('|'.join(problematic_patterns), regex=True)]
-                if not problematic_entries.empty:
-                    logger.warning(f"Encoding issues found in {col}, examples:")
-                    for i, (idx, row) in enumerate(problematic_entries.head(3).iterrows()):
-                        logger.warning(f"  {i+1}. {row[col]}")
+                # Check if issues were resolved, only the repaired rows can still have any
+                if col == 'title':
+                    remaining_issues = int((scan_encoding_signatures(final_df.loc[hits, col]) != 0).sum())
+    
+    return encoding_issues, examples, remaining_issues, signature_counts
+
+def log_encoding_verification(encoding_issues, examples, remaining_issues, signature_counts=None):
+    """Report the result of verify_encoding"""
+    for col, col_examples in examples.items():
+        logger.warning(f"Encoding issues found in {col}, examples:")
+        for i, example in enumerate(col_examples):
+            logger.warning(f"  {i+1}. {example}")
     
     if encoding_issues:
         logger.warning(f"Potential encoding issues remain in {len(encoding_issues)} columns: {encoding_issues}")
-        
-        # Additional deep cleaning pass for problematic entries
-        for col in encoding_issues.keys():
-            mask = final_df[col].astype(str).str.contains('|'.join(problematic_patterns), regex=True)
-            final_df.loc[mask, col] = final_df.loc[mask, col].apply(lambda x: fix_encoding_deep(fix_encoding_deep(x)))
-            
-        # Check if issues were resolved
-        remaining_issues = sum(final_df['title'].astype(str).str.contains('|'.join(problematic_patterns), regex=True))
+        for col, counts in (signature_counts or {}).items():
+            logger.info(f"  Signatures in {col}: {counts}")
         logger.info(f"After deep cleaning, remaining issues: {remaining_issues}")
     else:
         logger.info("No obvious encoding issues detected in cleaned dataset")
+
+def clean_zweig_bibliography(input_file, output_file, cache_dir=None, workers=1, manifest_file=None):
+    """Main function to clean the Zweig bibliography dataset with enhanced extraction"""
+    logger.info(f"Starting enhanced cleaning process for file: {input_file}")
+    run_started = time.time()
+    
+    # Reuse normalisation results from earlier runs with the same encoding rules and repair code
+    if cache_dir:
+        for cache in ENCODING_CACHES:
+            cache.load(cache_dir)
+        for authority in AUTHORITIES.values():
+            authority.load(cache_dir)
+    
+    # 1. Data Loading and Initial Assessment
+    logger.info("Step 1: Loading data and initial assessment")
+    try:
+        df = pd.read_csv(input_file)
+    except UnicodeDecodeError:
+        logger.info("UTF-8 decode error, trying with latin1 encoding")
+        df = pd.read_csv(input_file, encoding='latin1')
+    except Exception as e:
+        logger.error(f"Error loading file: {str(e)}")
+        raise
+        
+    log_dataframe_info(df, "Initial dataset")
+    
+    # 2. Structural Cleaning
+    logger.info("Step 2: Structural cleaning")
+    
+    # Remove unnecessary columns
+    if 'page_title' in df.columns and df['page_title'].isna().all():
+        logger.info("Removing 'page_title' column as it's 100% NULL")
+        df = df.drop(columns=['page_title'])
+    
+    log_dataframe_info(df, "After structural cleaning")
+    
+    # 3-7. Row-local cleaning, optionally incremental and spread over worker processes
+    if manifest_file:
+        df = clean_rows_incremental(df, manifest_file, workers, cache_dir)
+    else:
+        df = _clean_rows_any(df, workers, cache_dir)
+    
+    df = merge_extracted_fields(df)
+    
+    # 8. Prepare final dataset for manual editing
+    logger.info("Step 8: Preparing final dataset for manual editing")
+    final_df = prepare_final_dataset(df)
+    log_dataframe_info(final_df, "Final dataset for manual editing")
+    
+    # 9. Verify encoding quality
+    logger.info("Step 9: Verifying encoding quality")
+    log_encoding_verification(*verify_encoding(final_df))
+    
+    # Search and sort keys of the verified titles, authority ids of publishers and places
+    add_title_keys(final_df, df['sortkey'])
+    add_authority_ids(final_df)
+    
+    # Near-duplicate detection over the whole dataset
+    logger.info("Detecting near-duplicate entries")
+    clusters, similarity = find_near_duplicate_clusters(df['minhash_signature'].tolist())
+    final_df['duplicate_cluster'] = clusters
+    near_duplicates = near_duplicate_report(final_df, clusters, similarity)
+    log_near_duplicates(near_duplicates)
+    
+    # Redirect resolution over the whole dataset
+    logger.info("Resolving redirect chains")
+    final_df['canonical_page_id'], redirect_stats = resolve_redirects(
+        df['page_id'], df['redirect'], final_df['title'], df.get('page_title'))
+    log_redirect_resolution(redirect_stats)
+    
+    # Translation to original linkage over the whole dataset
+    logger.info("Linking translations to their originals")
+    content_items = build_content_items_table(df)
+    work_links = link_translations(final_df, content_items)
+    dates = build_dates_table(df)
     
     # 10. Export
     logger.info(f"Step 10: Exporting enhanced cleaned data to {output_file}")
     final_df.to_csv(output_file, index=False, encoding='utf-8')
     
+    content_items_file = companion_file_for(output_file, 'content_items')
+    content_items.to_csv(content_items_file, encoding='utf-8')
+    logger.info(f"Exported {len(content_items)} content items of {content_items.index.nunique()} entries to {content_items_file}")
+    
+    dates_file = companion_file_for(output_file, 'dates')
+    dates.to_csv(dates_file, encoding='utf-8')
+    logger.info(f"Exported {len(dates)} dates of {dates.index.nunique()} entries to {dates_file}")
+    
+    near_duplicates_file = companion_file_for(output_file, 'near_duplicates')
+    near_duplicates.to_csv(near_duplicates_file, index=False, encoding='utf-8')
+    logger.info(f"Exported the near-duplicate report to {near_duplicates_file}")
+    
+    work_links_file = companion_file_for(output_file, 'work_links')
+    work_links.to_csv(work_links_file, index=False, encoding='utf-8')
+    logger.info(f"Exported {len(work_links)} translation to original links to {work_links_file}")
+    _export_authorities(output_file, cache_dir)
+    
+    for cache in ENCODING_CACHES:
+        logger.info(f"Encoding cache statistics ({cache.func.__name__}): {cache.stats()}")
+    if ENCODING_RULE_STATS.enabled:
+        ENCODING_RULE_STATS.log_report()
+    if cache_dir:
+        for cache in ENCODING_CACHES:
+            cache.save(cache_dir)
+        prune_stage_cache(cache_dir, run_started)
+    
     logger.info("Enhanced cleaning process completed successfully")
     return final_df
 
+# Input columns that later steps read; the streaming mode loads nothing else. The year
+# is not read, the dates stage derives it from the content
+STREAMING_COLUMNS = [
+    'page_id', 'page_title', 'text_id', 'content', 'content_cleaned',
+    'publisher', 'location', 'language', 'page_count',
+]
+
+# Small input columns read in full by the streaming mode to fix their dtypes
+# and make the dataset-wide decisions before the first chunk is cleaned
+STREAMING_PRESCAN_COLUMNS = ['page_id', 'text_id', 'publisher', 'location', 'language', 'page_count']
+
+def detect_csv_encoding(path, block_size=1 << 20):
+    """Tell whether a file decodes as UTF-8 without loading it, falling back to latin1 like Step 1"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        logger.info("UTF-8 decode error, trying with latin1 encoding")
+        return 'latin1'
+    return 'utf-8'
+
+def _export_authorities(output_file, cache_dir=None):
+    """Write the publisher and place authorities next to the output and keep them for the next run"""
+    log_authorities()
+    authorities_file = companion_file_for(output_file, 'authorities')
+    pd.concat([authority.table() for authority in AUTHORITIES.values()]).to_csv(authorities_file, index=False, encoding='utf-8')
+    logger.info(f"Exported the publisher and place authorities to {authorities_file}")
+    if cache_dir:
+        for authority in AUTHORITIES.values():
+            authority.save(cache_dir)
+
+def _append_csv_columns(source, target, columns):
+    """Copy a CSV file row by row with more columns at the end, given as {name: values}"""
+    with open(source, 'r', encoding='utf-8', newline='') as src, open(target, 'w', encoding='utf-8', newline='') as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst, lineterminator=os.linesep)
+        writer.writerow(next(reader) + list(columns))
+        for row, values in zip(reader, zip(*columns.values())):
+            writer.writerow(row + list(values))
+
+def clean_zweig_bibliography_streaming(input_file, output_file, chunksize, cache_dir=None, workers=1):
+    """Clean the dataset chunk by chunk, writing finished rows as it goes. Only one chunk of the
+    needed input columns is held in memory. Produces the same file as clean_zweig_bibliography;
+    returns the number of rows written"""
+    logger.info(f"Starting streaming cleaning process for file: {input_file} ({chunksize} rows per chunk)")
+    run_started = time.time()
+    
+    # Reuse normalisation results from earlier runs with the same encoding rules and repair code
+    if cache_dir:
+        for cache in ENCODING_CACHES:
+            cache.load(cache_dir)
+        for authority in AUTHORITIES.values():
+            authority.load(cache_dir)
+    
+    # 1. Data Loading and Initial Assessment
+    logger.info("Step 1: Scanning input columns")
+    encoding = detect_csv_encoding(input_file)
+    header = pd.read_csv(input_file, nrows=0, encoding=encoding).columns
+    usecols = [col for col in STREAMING_COLUMNS if col in header]
+    prescan = pd.read_csv(input_file, usecols=[col for col in STREAMING_PRESCAN_COLUMNS if col in header], encoding=encoding)
+    
+    # Every chunk gets the dtypes pandas infers for the whole column
+    dtypes = {col: (str if dtype == object or pd.api.types.is_string_dtype(dtype) else dtype) for col, dtype in prescan.dtypes.items()}
+    
+    # Dataset-wide decisions of merge_extracted_fields and Step 8
+    catalog_numbers = extract_catalog_numbers_column(prescan.get('text_id', pd.Series('', index=prescan.index)))
+    catalog_columns = []
+    if catalog_numbers['catalog_number_1'].astype(str).ne("").any():
+        catalog_columns.append('catalog_number_1')
+        if catalog_numbers['catalog_number_2'].astype(str).ne("").any():
+            catalog_columns.append('catalog_number_2')
+    merge_flags = {
+        'keep_catalog_numbers': bool(catalog_columns),
+        'fill_language': 'language' in prescan.columns and prescan['language'].isna().sum() > 0,
+        'fill_page_count': 'page_count' in prescan.columns and prescan['page_count'].isna().sum() > 0,
+    }
+    del prescan, catalog_numbers
+    
+    # The tables are written to partial files that replace the outputs when all chunks are done
+    partial_file = output_file + '.partial'
+    content_items_file = companion_file_for(output_file, 'content_items')
+    content_items_partial = content_items_file + '.partial'
+    dates_file = companion_file_for(output_file, 'dates')
+    dates_partial = dates_file + '.partial'
+    total_items = 0
+    total_dates = 0
+    # Signatures, redirects and report columns are kept for the near-duplicate
+    # detection and the redirect resolution at the end
+    signatures = []
+    redirects = []
+    page_titles = []
+    report_rows = []
+    item_original_titles = []
+    encoding_issues = {col: 0 for col in VERIFIED_COLUMNS}
+    examples = {col: [] for col in VERIFIED_COLUMNS}
+    signature_counts = {col: {} for col in VERIFIED_COLUMNS}
+    remaining_issues = 0
+    total_rows = 0
+    final_columns = None
+    
+    # One pool of worker processes cleans all chunks, each worker keeps its caches between them
+    with worker_pool(workers, cache_dir) if workers > 1 else contextlib.nullcontext() as pool:
+        reader = pd.read_csv(input_file, usecols=usecols, dtype=dtypes, encoding=encoding, chunksize=chunksize)
+        for chunk in reader:
+            # 3-7. Row-local cleaning
+            chunk = _clean_rows_any(chunk, workers, cache_dir, pool)
+            chunk = merge_extracted_fields(chunk, **merge_flags)
+            
+            # 8. Final columns
+            final_chunk = prepare_final_dataset(chunk, catalog_columns)
+            chunk_items = build_content_items_table(chunk)
+            chunk_dates = build_dates_table(chunk)
+            chunk_sortkeys = chunk['sortkey']
+            signatures.extend(chunk['minhash_signature'])
+            redirects.extend(chunk['redirect'])
+            page_titles.extend(chunk['page_title'] if 'page_title' in chunk.columns else [None] * len(chunk))
+            del chunk
+            
+            # 9. Encoding verification, summarised over all chunks
+            chunk_issues, chunk_examples, chunk_remaining, chunk_signatures = verify_encoding(final_chunk)
+            for col, count in chunk_issues.items():
+                encoding_issues[col] += count
+                examples[col] = (examples[col] + chunk_examples[col])[:3]
+                for signature, signature_count in chunk_signatures[col].items():
+                    signature_counts[col][signature] = signature_counts[col].get(signature, 0) + signature_count
+            remaining_issues += chunk_remaining
+            add_title_keys(final_chunk, chunk_sortkeys)
+            add_authority_ids(final_chunk)
+            
+            # 10. Export
+            final_chunk.to_csv(partial_file, mode='w' if total_rows == 0 else 'a', header=total_rows == 0, index=False, encoding='utf-8')
+            chunk_items.to_csv(content_items_partial, mode='w' if total_rows == 0 else 'a', header=total_rows == 0, encoding='utf-8')
+            chunk_dates.to_csv(dates_partial, mode='w' if total_rows == 0 else 'a', header=total_rows == 0, encoding='utf-8')
+            final_columns = final_chunk.columns.tolist()
+            report_rows.append(final_chunk[[col for col in ['page_id', 'text_id', 'title', 'original_title', 'year'] if col in final_columns]])
+            item_original_titles.append(chunk_items[['position', 'original_title']])
+            total_rows += len(final_chunk)
+            total_items += len(chunk_items)
+            total_dates += len(chunk_dates)
+            logger.info(f"Cleaned and wrote {total_rows} rows")
+    
+    if final_columns is None:
+        raise ValueError(f"No rows found in {input_file}")
+    
+    logger.info("Step 9: Verifying encoding quality")
+    log_encoding_verification(
+        {col: count for col, count in encoding_issues.items() if count},
+        {col: col_examples for col, col_examples in examples.items() if col_examples},
+        remaining_issues,
+        {col: counts for col, counts in signature_counts.items() if counts},
+    )
+    
+    logger.info("Detecting near-duplicate entries")
+    clusters, similarity = find_near_duplicate_clusters(signatures)
+    near_duplicates = near_duplicate_report(pd.concat(report_rows, ignore_index=True), clusters, similarity)
+    log_near_duplicates(near_duplicates)
+    
+    logger.info("Resolving redirect chains")
+    report = pd.concat(report_rows, ignore_index=True)
+    canonical, redirect_stats = resolve_redirects(report['page_id'], redirects, report['title'], pd.Series(page_titles, dtype=object))
+    log_redirect_resolution(redirect_stats)
+    
+    logger.info("Linking translations to their originals")
+    report['canonical_page_id'] = canonical
+    work_links = link_translations(report, pd.concat(item_original_titles))
+    del signatures, redirects, page_titles, report_rows, report, item_original_titles
+    
+    logger.info(f"Step 10: Exporting enhanced cleaned data to {output_file}")
+    _append_csv_columns(partial_file, output_file, {
+        'duplicate_cluster': ["" if pd.isna(cluster) else str(cluster) for cluster in clusters],
+        'canonical_page_id': ["" if pd.isna(page_id) else str(page_id) for page_id in canonical],
+    })
+    os.remove(partial_file)
+    os.replace(content_items_partial, content_items_file)
+    logger.info(f"Exported {total_items} content items to {content_items_file}")
+    os.replace(dates_partial, dates_file)
+    logger.info(f"Exported {total_dates} dates to {dates_file}")
+    near_duplicates_file = companion_file_for(output_file, 'near_duplicates')
+    near_duplicates.to_csv(near_duplicates_file, index=False, encoding='utf-8')
+    logger.info(f"Exported the near-duplicate report to {near_duplicates_file}")
+    work_links_file = companion_file_for(output_file, 'work_links')
+    work_links.to_csv(work_links_file, index=False, encoding='utf-8')
+    logger.info(f"Exported {len(work_links)} translation to original links to {work_links_file}")
+    _export_authorities(output_file, cache_dir)
+    
+    for cache in ENCODING_CACHES:
+        logger.info(f"Encoding cache statistics ({cache.func.__name__}): {cache.stats()}")
+    if ENCODING_RULE_STATS.enabled:
+        ENCODING_RULE_STATS.log_report()
+    if cache_dir:
+        for cache in ENCODING_CACHES:
+            cache.save(cache_dir)
+        prune_stage_cache(cache_dir, run_started)
+    
+    logger.info("Streaming cleaning process completed successfully")
+    return total_rows
+
+# Top-level categories of the bibliography, main_category has to start with one of them
+CATEGORY_ROOTS = [
+    'Fiction', 'Essays', 'Poetry', 'Dramas', 'Dramatic Readings', 'Films', 'Correspondence',
+    'Historical Studies', 'Secondary Literature', 'Translations by Zweig', 'Forewords and Afterwords',
+    'Collected and Selected Works', 'Symposia and Exhibitions', 'Newspapers',
+]
+
+# Declarative schema of the final dataset. Per column:
+#   required: the value must not be missing or empty
+#   type: 'integer' or 'number', present values must parse as such
+#   range: (minimum, maximum) of present numeric values, None for an open end
+#   unique: present values must not repeat
+#   allowed: present values must be one of these
+#   pattern: present values must match this regular expression at their start
+OUTPUT_SCHEMA = {
+    'page_id': {'required': True, 'type': 'integer', 'unique': True},
+    'text_id': {'type': 'integer'},
+    'title': {'required': True, 'pattern': r'.*\w'},
+    'title_source': {'allowed': TITLE_SOURCES},
+    'year': {'type': 'integer', 'range': (1800, 2030)},
+    'publisher_id': {'type': 'integer', 'range': (1, None)},
+    'location_id': {'type': 'integer', 'range': (1, None)},
+    'language': {'allowed': list(LANGUAGE_MAP.values())},
+    'page_count': {'type': 'integer', 'range': (1, 5000)},
+    'main_category': {'pattern': r'(?:' + '|'.join(map(re.escape, CATEGORY_ROOTS)) + r')(?!\w)'},
+    'time_period': {'allowed': TIME_PERIODS},
+    'duplicate_cluster': {'type': 'integer', 'range': (1, None)},
+    'canonical_page_id': {'type': 'integer'},
+}
+
+# Columns an entry needs depending on its main category
+CATEGORY_REQUIRED_COLUMNS = {
+    'Fiction': ['year', 'language'],
+    'Poetry': ['year'],
+    'Dramas': ['year'],
+    'Essays': ['year'],
+    'Historical Studies': ['year'],
+    'Secondary Literature': ['year'],
+    'Collected and Selected Works': ['year', 'publisher'],
+}
+
+VIOLATION_COLUMNS = ['row_id', 'rule', 'value']
+
+def _present_mask(values):
+    """Mask of the values that are neither missing nor empty strings"""
+    present = values.notna()
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        present &= values.astype(str).str.strip() != ""
+    return present
+
+def _violations(rule, values, mask):
+    """Violation rows of one rule for the values selected by mask"""
+    values = values[mask]
+    return pd.DataFrame({'row_id': values.index, 'rule': rule, 'value': values.astype(str).to_numpy()})
+
+def _unique_violations(column, values):
+    """Violations of a unique rule: every present value that repeats an earlier one"""
+    return _violations(f"{column}.unique", values, _present_mask(values) & values.duplicated())
+
+def check_schema(df, schema=None, category_required=None):
+    """Validate df against a declarative schema with one vectorised mask per rule.
+    Returns the violations as a table of row_id (index of df), rule and value"""
+    schema = OUTPUT_SCHEMA if schema is None else schema
+    category_required = CATEGORY_REQUIRED_COLUMNS if category_required is None else category_required
+    violations = []
+    
+    for column, rules in schema.items():
+        if column not in df.columns:
+            violations.append(pd.DataFrame({'row_id': [None], 'rule': [f"{column}.column"], 'value': ["missing"]}))
+            continue
+        values = df[column]
+        present = _present_mask(values)
+        if rules.get('required'):
+            violations.append(_violations(f"{column}.required", values, ~present))
+        if rules.get('type'):
+            numbers = pd.to_numeric(values.where(present), errors='coerce')
+            invalid = present & numbers.isna()
+            if rules['type'] == 'integer':
+                invalid |= numbers.notna() & (numbers % 1 != 0)
+            violations.append(_violations(f"{column}.type", values, invalid))
+            if rules.get('range'):
+                minimum, maximum = rules['range']
+                outside = pd.Series(False, index=values.index)
+                if minimum is not None:
+                    outside |= numbers < minimum
+                if maximum is not None:
+                    outside |= numbers > maximum
+                violations.append(_violations(f"{column}.range", values, outside))
+        if rules.get('unique'):
+            violations.append(_unique_violations(column, values))
+        if rules.get('allowed'):
+            violations.append(_violations(f"{column}.allowed", values, present & ~values.isin(rules['allowed'])))
+        if rules.get('pattern'):
+            matches = values.astype(str).str.match(rules['pattern'])
+            violations.append(_violations(f"{column}.pattern", values, present & ~matches))
+    
+    if 'main_category' in df.columns:
+        for category, columns in category_required.items():
+            in_category = df['main_category'] == category
+            for column in columns:
+                if column in df.columns:
+                    violations.append(_violations(f"{column}.required[{category}]", df[column],
+                                                  in_category & ~_present_mask(df[column])))
+    
+    violations = [frame for frame in violations if len(frame)]
+    if not violations:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+    return pd.concat(violations, ignore_index=True).sort_values('row_id', kind='stable', ignore_index=True)
+
+def log_violations(violations):
+    """Log the number of schema violations per rule"""
+    if violations.empty:
+        logger.info("No schema violations in the final dataset")
+        return
+    logger.warning(f"{len(violations)} schema violations in {violations['row_id'].nunique()} rows:")
+    for rule, count in violations['rule'].value_counts(sort=False).items():
+        logger.warning(f"  - {rule}: {count}")
+
 def validate_output(df):
     """Perform validation checks on the cleaned output"""
+    start = time.perf_counter()
     validation_results = {
         "total_records": len(df),
         "columns": df.columns.tolist(),
-        "missing_values": {col: df[col].isna().sum() for col in df.columns},
-        "empty_strings": {col: (df[col] == "").sum() for col in df.columns if df[col].dtype == 'object'},
-        "encoding_issues": {}
+        "missing_values": df.isna().sum().to_dict(),
+        "empty_strings": {col: (df[col] == "").sum() for col in df.columns
+                          if df[col].dtype == 'object' or isinstance(df[col].dtype, pd.CategoricalDtype)},
+        "encoding_issues": {},
+        "violations": check_schema(df)
     }
     
-    # Check for potential encoding issues
-    problematic_patterns = ['Ã', 'Ä', 'Å', 'á¸', 'á¹', 'č', 'ā­']
+    # Check for potential encoding issues, with the signatures of the encoding verification
+    problematic_patterns = list(ENCODING_SIGNATURES.values())
     for col in df.columns:
         if df[col].dtype == 'object':
             pattern_count = df[col].astype(str).str.contains('|'.join(problematic_patterns), regex=True).sum()
-            if pattern_count > 0:
-                validation_results["encoding_issues"][col] = pattern_count
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Check each distinct value once and count the rows that have it
+            value_counts = df[col].value_counts()
+            pattern_count = value_counts[value_counts.index.astype(str).str.contains('|'.join(problematic_patterns), regex=True)].sum()
+        else:
+            continue
+        if pattern_count > 0:
+            validation_results["encoding_issues"][col] = pattern_count
     
+    validation_results["seconds"] = time.perf_counter() - start
     return validation_results
 
+def validate_output_file(output_file, chunksize):
+    """Run validate_output over a written output file chunk by chunk and add up the results"""
+    totals = None
+    violations = []
+    unique_values = {column: [] for column, rules in OUTPUT_SCHEMA.items() if rules.get('unique')}
+    for chunk in read_cleaned_dataset(output_file, dtype=object, keep_default_na=False, chunksize=chunksize):
+        results = validate_output(chunk)
+        violations.append(results["violations"])
+        for column, values in unique_values.items():
+            if column in chunk.columns:
+                values.append(chunk[column])
+        if totals is None:
+            totals = results
+            continue
+        totals["total_records"] += results["total_records"]
+        totals["seconds"] += results["seconds"]
+        for key in ["missing_values", "empty_strings", "encoding_issues"]:
+            for col, count in results[key].items():
+                totals[key][col] = totals[key].get(col, 0) + count
+    
+    # Values can repeat across chunks, so the unique rules are checked again over the whole file
+    violations = pd.concat(violations, ignore_index=True)
+    unique_rules = [f"{column}.unique" for column in unique_values]
+    violations = [violations[~violations['rule'].isin(unique_rules)]]
+    for column, values in unique_values.items():
+        if values:
+            violations.append(_unique_violations(column, pd.concat(values)))
+    totals["violations"] = pd.concat(violations, ignore_index=True).sort_values('row_id', kind='stable', ignore_index=True)
+    return totals
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Clean the Zweig bibliography for manual editing')
+    parser.add_argument('--input', default="zweig_bibliography_cleaned_20250411_1024.csv", help='Path to the CSV file to clean')
+    parser.add_argument('--output', default="zweig_bibliography_enhanced.csv", help='Path of the cleaned CSV file')
+    parser.add_argument('--cache-dir', default=None, help='Directory for cached encoding repairs and stage results, e.g. normalisation_cache (no disk cache if not given)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for the row-local cleaning steps')
+    parser.add_argument('--manifest', default=None, help='Only clean rows that are new or changed since the run that wrote this manifest')
+    parser.add_argument('--rule-stats', default=None, help='Write hits per encoding rule and the total scan time to this JSON file (disables all caches)')
+    parser.add_argument('--chunksize', type=int, default=None, help='Stream the input in chunks of this many rows instead of loading it at once')
+    parser.add_argument('--strict', action='store_true', help='Exit with an error if the output violates the schema')
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    # Configuration (could be moved to a config file)
-    input_file = "zweig_bibliography_cleaned_20250411_1024.csv"
-    output_file = "zweig_bibliography_enhanced.csv"
+    args = parse_args()
+    input_file = args.input
+    output_file = args.output
+    cache_dir = args.cache_dir
+    manifest_file = args.manifest
     
     if not os.path.exists(input_file):
         logger.error(f"Input file {input_file} not found")
         exit(1)
     
-    # Run the enhanced cleaning process
-    cleaned_df = clean_zweig_bibliography(input_file, output_file)
+    # Rule statistics have to see every repair, cached results and reused rows would hide some
+    if args.rule_stats:
+        logger.info("Counting encoding rule hits, the caches and the manifest are not used")
+        enable_rule_stats()
+        cache_dir = None
+        manifest_file = None
+    
+    # Run the enhanced cleaning process and validate the output
+    if args.chunksize:
+        if manifest_file:
+            logger.warning("The manifest is not used in streaming mode, all rows are cleaned")
+        total_records = clean_zweig_bibliography_streaming(input_file, output_file, args.chunksize, cache_dir, args.workers)
+        validation_results = validate_output_file(output_file, args.chunksize)
+        sample_rows = read_cleaned_dataset(output_file, dtype=object, keep_default_na=False, nrows=3)
+    else:
+        cleaned_df = clean_zweig_bibliography(input_file, output_file, cache_dir, args.workers, manifest_file)
+        total_records = len(cleaned_df)
+        validation_results = validate_output(cleaned_df)
+        sample_rows = cleaned_df.head(3)
     
-    # Validate the output
-    validation_results = validate_output(cleaned_df)
+    if args.rule_stats:
+        ENCODING_RULE_STATS.save(args.rule_stats)
     
     # Output a summary report
     logger.info("\nEnhanced Cleaning Summary Report:")
     logger.info(f"Input file: {input_file}")
     logger.info(f"Output file: {output_file}")
-    logger.info(f"Total records processed: {len(cleaned_df)}")
+    logger.info(f"Total records processed: {total_records}")
     logger.info(f"Character encoding issues fixed in text columns")
     logger.info(f"Wiki markup completely removed from content")
     logger.info(f"Enhanced bibliographic data extracted from content")
@@ -1054,10 +2788,18 @@ if __name__ == "__main__":
     else:
         logger.info("No obvious encoding issues detected in final dataset")
     
+    violations = validation_results["violations"]
+    log_violations(violations)
+    violations_file = companion_file_for(output_file, 'violations')
+    violations.to_csv(violations_file, index=False, encoding='utf-8')
+    logger.info(f"Exported the schema violations to {violations_file} (validated in {validation_results['seconds']:.2f}s)")
+    
     # Display some sample rows from the cleaned dataset
     logger.info("\nSample rows from enhanced cleaned dataset for manual editing:")
-    sample_rows = cleaned_df.head(3)
     for i, row in sample_rows.iterrows():
         logger.info(f"\nRow {i}:")
         for col in row.index:
-            logger.info(f"{col}: {row[col]}")
\ No newline at end of file
+            logger.info(f"{col}: {row[col]}")    
+    if args.strict and not violations.empty:
+        logger.error(f"Output violates the schema in {len(violations)} places, see {violations_file}")
+        exit(1)
@@ -16,6 +16,8 @@ import logging
 import os
 from datetime import datetime
 
+from zweig_dataset import read_cleaned_dataset
+
 # Configure logging
 log_dir = "logs"
 os.makedirs(log_dir, exist_ok=True)
@@ -52,9 +54,9 @@ def load_and_analyze_bibliography(file_path):
     """Analyze a bibliography CSV file and log statistics"""
     logger.info(f"Starting analysis of file: {file_path}")
     
-    # Load CSV file
+    # Load CSV file, with the low-cardinality columns as categoricals
     try:
-        df = pd.read_csv(file_path)
+        df = read_cleaned_dataset(file_path)
         logger.info(f"Successfully loaded {len(df)} entries")
     except Exception as e:
         logger.error(f"Error loading file: {e}")
@@ -317,8 +319,8 @@ def load_and_analyze_bibliography(file_path):
         # Create a copy of years_df to avoid SettingWithCopyWarning
         period_df = years_df.copy()
         
-        # Add time period to period_df
-        period_df.loc[:, 'time_period'] = 'Pre-Zweig'
+        # Add time period to period_df, replacing a categorical time_period of the file
+        period_df['time_period'] = 'Pre-Zweig'
         period_df.loc[(period_df['year'] >= 1881) & (period_df['year'] <= 1942), 'time_period'] = 'During Lifetime'
         period_df.loc[(period_df['year'] > 1942) & (period_df['year'] <= 1980), 'time_period'] = 'Post-WWII'
         period_df.loc[(period_df['year'] > 1980) & (period_df['year'] <= 2000), 'time_period'] = 'Late 20th Century'
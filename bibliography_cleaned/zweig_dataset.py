@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Stefan Zweig Bibliography Dataset
+---------------------------------
+Column types of the cleaned dataset, shared by to-klawiter-cleaned.py, which
+writes it, and zweig_analysis.py, which reads it.
+"""
+
+import pandas as pd
+
+# Low-cardinality columns of the final dataset, stored as categoricals
+CATEGORICAL_COLUMNS = ['title_source', 'publisher', 'location', 'language', 'categories', 'main_category', 'time_period']
+
+def categorise_columns(df):
+    """Store the columns in CATEGORICAL_COLUMNS as categoricals, each distinct value is kept once"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+def read_cleaned_dataset(path, dtype=None, **kwargs):
+    """Read a dataset written by to-klawiter-cleaned.py with its categorical columns restored.
+    The other columns get dtype, or the types pandas infers; kwargs go to read_csv"""
+    dtypes = {}
+    if dtype is not None:
+        header = pd.read_csv(path, nrows=0, encoding=kwargs.get('encoding')).columns
+        dtypes = {col: dtype for col in header}
+    dtypes.update({col: 'category' for col in CATEGORICAL_COLUMNS})
+    return pd.read_csv(path, dtype=dtypes, **kwargs)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Stefan Zweig Bibliography Dates
+-------------------------------
+The long date table of the bibliography entries, shared by to-klawiter-cleaned.py
+and analyse-csv-output.py.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+# A year, optionally with a month before it and the end of a range after it ("1925-27",
+# "[March 1902]", "1924/25"). The word before the date is kept as a hint to its role, and
+# dates that continue a list right after another year ("1938, 1941 and 1943") are marked
+DATE_PATTERN = re.compile(
+    r'(?:\b(?P<cue>(?!(?:' + '|'.join(MONTHS) + r')\b)[A-Za-z]+)\.?:?\s+(?:in\s+|as\s+)?'
+    r'|(?P<list>(?<=\d{4}),\s*|(?<=\d{4})\s+and\s+))?'
+    r'\[?(?:(?P<month>' + '|'.join(MONTHS) + r')\s+)?'
+    r'\b(?P<year>1[89]\d{2}|20[0-2]\d)\b'
+    r'(?:\s*[-–/]\s*(?P<end>(?:1[89]|20)?\d{2})\b(?![-/]\d))?'
+)
+# Words before a date that mark it as the date of a reprint or later edition
+REPRINT_CUE_PATTERN = r'(?i)^(?:reprint(?:ed|s)?|re-?issued?|re-?published|editions?|ed|printing|neuauflage|auflage)$'
+
+# Fields of a date, in the order of the columns of the date table
+DATE_FIELDS = ['year', 'end_year', 'month', 'role']
+
+def extract_date_table(contents):
+    """Extract every year and year range of a whole column of entries with str.extractall.
+    Returns a long table with one row per date, indexed by (row, match), with the year,
+    end_year of ranges, month number and a role hint: the first date of an entry that is
+    not a reprint is its publication date, later dates are reprints or mentions"""
+    contents = pd.Series(contents, dtype=object)
+    found = contents.str.extractall(DATE_PATTERN)
+    years = found['year'].astype(int).to_numpy()
+    
+    # Two-digit range ends take the century of the start year ("1925-27"), ends that are
+    # not after the start are no ranges
+    end = pd.to_numeric(found['end'], errors='coerce').to_numpy(dtype=float)
+    short = (found['end'].str.len() == 2).to_numpy(dtype=bool)
+    end = np.where(short, years - years % 100 + end, end)
+    end = np.where(end > years, end, np.nan)
+    
+    # Dates continuing a list take the role of the date they follow
+    reprint = found['cue'].str.match(REPRINT_CUE_PATTERN).astype(object).where(found['list'].isna(), None)
+    reprint = reprint.groupby(level=0).ffill().fillna(False).astype(bool).to_numpy()
+    rows = found.index.get_level_values(0)
+    positions = np.arange(len(found))
+    candidates = pd.Series(np.where(reprint, len(found), positions), index=rows)
+    first = candidates.groupby(level=0).transform('min').to_numpy()
+    role = np.select([reprint, positions == first], ['reprint', 'publication'], 'mention')
+    
+    return pd.DataFrame({
+        'year': years,
+        'end_year': pd.array(end, dtype='Int64'),
+        'month': found['month'].map({month: i for i, month in enumerate(MONTHS, 1)}).astype('Int64').to_numpy(),
+        'role': role,
+    }, index=found.index)